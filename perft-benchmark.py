@@ -0,0 +1,60 @@
+"""
+Perft benchmark and correctness check for the in-house move generator.
+
+Runs perft over the FEN corpus (random_fens.txt and src/utils/random_fens.py),
+reports nodes per second, and optionally diffs the node counts against
+python-chess.
+
+    python perft-benchmark.py --depth 3 --oracle
+    python perft-benchmark.py --depth 5 --processes 8 --limit 4
+"""
+
+import argparse
+import sys
+
+from src.perft import load_fen_corpus, run_perft
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=3, help="perft depth (default: 3)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="split root moves across this many processes (default: 1)")
+    parser.add_argument("--oracle", action="store_true",
+                        help="diff node counts against python-chess")
+    parser.add_argument("--limit", type=int, default=None, help="only run the first N positions")
+    parser.add_argument("--fen", action="append", default=None,
+                        help="run this FEN instead of the corpus (repeatable)")
+    args = parser.parse_args()
+    if args.depth < 1:
+        parser.error("--depth must be at least 1")
+
+    fens = args.fen or load_fen_corpus()
+    if args.limit is not None:
+        fens = fens[:args.limit]
+
+    total_nodes = 0
+    total_seconds = 0.0
+    failures = 0
+    for index, fen in enumerate(fens):
+        result = run_perft(fen, args.depth, args.processes, args.oracle)
+        total_nodes += result.nodes
+        total_seconds += result.seconds
+        status = ""
+        if args.oracle:
+            status = "ok" if result.ok and not result.mismatches else f"MISMATCH (expected {result.expected})"
+        print(f"{index:4d} {result.nodes:>12d} nodes {result.seconds:8.3f}s {result.nps:>12,.0f} nps {status}  {fen}")
+        if result.mismatches:
+            failures += 1
+            for uci, (ours, theirs) in sorted(result.mismatches.items()):
+                print(f"       {uci}: ours={ours} python-chess={theirs}")
+
+    nps = total_nodes / total_seconds if total_seconds > 0 else 0.0
+    print(f"\n{len(fens)} positions, depth {args.depth}: {total_nodes} nodes in {total_seconds:.3f}s ({nps:,.0f} nps)")
+    if args.oracle:
+        print(f"{failures} position(s) disagree with python-chess")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+from typing import List, Sequence
+
+# Squares are numbered the same way as `decompress_nn_output`: row * 8 + col,
+# with row 0 being the first row of `Board.state` (rank 8) and col 0 file a.
+WHITE = 0
+BLACK = 1
+COLORS = "wb"
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+PIECE_TYPES = "pnbrqk"
+
+# Castling rights bits, as kept in `Board.castling_rights`
+WHITE_KING_SIDE = 1
+WHITE_QUEEN_SIDE = 2
+BLACK_KING_SIDE = 4
+BLACK_QUEEN_SIDE = 8
+
+SQUARE_BB: List[int] = [1 << sq for sq in range(64)]
+FULL_BB = (1 << 64) - 1
+
+
+def square_index(row: int, col: int) -> int:
+    return row * 8 + col
+
+
+def color_index(color: str) -> int:
+    return WHITE if color == "w" else BLACK
+
+
+def piece_index(piece_type: str, color: str) -> int:
+    """
+    Index of a piece set in `Bitboards.pieces`: white p, n, b, r, q, k
+    occupy 0-5 and black p, n, b, r, q, k occupy 6-11.
+    """
+    return color_index(color) * 6 + PIECE_TYPES.index(piece_type)
+
+
+def piece_code(piece_type: str, color: str) -> int:
+    """
+    Mailbox code of a piece: its `Bitboards.pieces` index plus one, so that
+    0 (EMPTY) can mark an empty square.
+    """
+    return piece_index(piece_type, color) + 1
+
+
+EMPTY = 0
+# CODE_TYPES[code] / CODE_COLORS[code] decode a mailbox code (index 0 unused)
+CODE_TYPES = " " + PIECE_TYPES * 2
+CODE_COLORS = " " + "w" * 6 + "b" * 6
+
+
+def iter_bits(bb: int):
+    """Yields the square index of every set bit, lowest first."""
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+class Bitboards:
+    """
+    Bitboard mirror of the board's mailbox: twelve 64-bit piece sets plus
+    one occupancy set per color. `Board` keeps it in sync on every change so
+    move generators can answer "what is on this square" with a bit test.
+    """
+
+    __slots__ = ("pieces", "occupancy")
+
+    def __init__(self):
+        self.pieces: List[int] = [0] * 12
+        self.occupancy: List[int] = [0, 0]
+
+    @classmethod
+    def from_squares(cls, squares: Sequence[int]) -> 'Bitboards':
+        """Builds the sets from a 64-entry mailbox of piece codes."""
+        bitboards = cls()
+        for sq, code in enumerate(squares):
+            if code:
+                bitboards.add(sq, code - 1)
+        return bitboards
+
+    @property
+    def occupied(self) -> int:
+        return self.occupancy[WHITE] | self.occupancy[BLACK]
+
+    def add(self, sq: int, index: int):
+        """Sets `sq` in piece set `index` (see `piece_index`) and its color's occupancy."""
+        bit = SQUARE_BB[sq]
+        self.pieces[index] |= bit
+        self.occupancy[index // 6] |= bit
+
+    def remove(self, sq: int, index: int):
+        mask = ~SQUARE_BB[sq]
+        self.pieces[index] &= mask
+        self.occupancy[index // 6] &= mask
@@ -1,7 +1,32 @@
+from array import array
 from typing import List, Optional, Tuple
 import sys
 
+import numpy as np
+
 from .piece import Piece, Position
+from .bitboard import (
+  CODE_COLORS,
+  CODE_TYPES,
+  EMPTY,
+  KING,
+  PAWN,
+  WHITE_KING_SIDE,
+  WHITE_QUEEN_SIDE,
+  BLACK_KING_SIDE,
+  BLACK_QUEEN_SIDE,
+  Bitboards,
+  color_index,
+  piece_code,
+  square_index,
+)
+from .move_list import MoveList
+from .nn_input import CODE_INPUT_BYTES, SQUARE_INPUTS, encode_squares
+from .legal_moves.generate import generate_legal_moves, has_legal_move, is_legal_move
+from .legal_moves.pins import get_pin_info
+from .outcome import Outcome, compute_outcome
+from .position_cache import CachedPosition, PositionCache
+from .zobrist import BLACK_TO_MOVE_KEY, CASTLING_KEYS, PIECE_KEYS, compute_hash, ep_key
 from .utils.coordinates_to_notations import coordinates_to_notations
 from .utils.parse_fen import parse_fen, ParsedFEN
 from .utils.default_board_state import make_default_state
@@ -9,7 +34,22 @@ from .utils.decompress_nn_output import decompress_nn_output
 
 Position = Tuple[int, int]
 
+# Rights that survive a move touching each square: moving the king or a rook,
+# or capturing on a rook's home square, gives the matching rights up.
+CASTLING_RIGHTS_KEPT = [15] * 64
+CASTLING_RIGHTS_KEPT[square_index(7, 4)] = 15 & ~(WHITE_KING_SIDE | WHITE_QUEEN_SIDE)
+CASTLING_RIGHTS_KEPT[square_index(7, 7)] = 15 & ~WHITE_KING_SIDE
+CASTLING_RIGHTS_KEPT[square_index(7, 0)] = 15 & ~WHITE_QUEEN_SIDE
+CASTLING_RIGHTS_KEPT[square_index(0, 4)] = 15 & ~(BLACK_KING_SIDE | BLACK_QUEEN_SIDE)
+CASTLING_RIGHTS_KEPT[square_index(0, 7)] = 15 & ~BLACK_KING_SIDE
+CASTLING_RIGHTS_KEPT[square_index(0, 0)] = 15 & ~BLACK_QUEEN_SIDE
+
+# Initial capacity of the undo stack; it doubles if a game runs longer.
+MAX_PLY = 256
+
 class Cell:
+  __slots__ = ("piece", "color")
+
   def __init__(self, piece: Optional[Piece], color: str):
     self.piece = piece
     self.color = color  # 'w' or 'b'
@@ -20,65 +60,413 @@ class Cell:
     else:
       return self.piece.type
 
+class CellView(Cell):
+  """
+  A `Cell` backed by one square of a board's mailbox. Reading `piece`
+  builds a Piece view of the stored code; assigning it writes the code back.
+  """
+  __slots__ = ("_board", "_square")
+
+  def __init__(self, board: 'Board', square: int):
+    self._board = board
+    self._square = square
+    self.color = "w" if ((square >> 3) + (square & 7)) % 2 == 0 else "b"
+
+  @property
+  def piece(self) -> Optional[Piece]:
+    return self._board.piece_at(self._square)
+
+  @piece.setter
+  def piece(self, piece: Optional[Piece]):
+    self._board.set_piece(divmod(self._square, 8), piece)
+
 class Board:
   num_row = 8
   num_col = 8
 
-  def __init__(self, fen: str, parsed_board: Optional[ParsedFEN] = None):
+  def __init__(
+    self,
+    fen: str,
+    parsed_board: Optional[ParsedFEN] = None,
+    cache: Optional[PositionCache] = None
+  ):
     self.num_tries = 0
     self.fen = fen
     self.parsed_fen = parsed_board
+    # Mailbox of piece codes (see `bitboard.piece_code`), 0 for empty squares
+    self.squares = bytearray(64)
     if parsed_board:
-      self.state: List[List[Cell]] = []
       for row_index, row in enumerate(parsed_board['board']):
-        board_row = []
         for col_index, cell in enumerate(row):
-          square_color = "w" if (row_index + col_index) % 2 == 0 else "b"
-          if cell == "":
-            board_row.append(Cell(None, square_color))
-          else:
+          if cell != "":
             color = "w" if cell.isupper() else "b"
-            piece_type = cell.lower()
-            piece = Piece(piece_type, color, (row_index, col_index))
-            board_row.append(Cell(piece, square_color))
-        self.state.append(board_row)
+            self.squares[square_index(row_index, col_index)] = piece_code(cell.lower(), color)
     else:
-      self.state = make_default_state()
+      for row_index, row in enumerate(make_default_state()):
+        for col_index, cell in enumerate(row):
+          if cell.piece is not None:
+            self.squares[square_index(row_index, col_index)] = piece_code(cell.piece.type, cell.piece.color)
+    self.bitboards = Bitboards.from_squares(self.squares)
+    # Piece identities: every piece gets an id when it first appears and keeps
+    # it while it moves, so Piece views can follow it. `square_ids` maps a
+    # square to the id on it (-1 if empty), `id_squares` an id to its square
+    # (-1 once captured), and `piece_lists` holds the ids on the board per
+    # color, so "all pieces of a color" is at most 16 entries, not 64 cells.
+    self.square_ids = array("h", [-1]) * 64
+    self.id_squares = array("b")
+    self.piece_lists: List[List[int]] = [[], []]
+    self.king_squares = [-1, -1]
+    for sq, code in enumerate(self.squares):
+      if code:
+        pid = len(self.id_squares)
+        self.id_squares.append(sq)
+        self.square_ids[sq] = pid
+        self.piece_lists[(code - 1) // 6].append(pid)
+        if (code - 1) % 6 == KING:
+          self.king_squares[(code - 1) // 6] = sq
+    self._state: Optional[List[List[CellView]]] = None
+    # Per-color check/pin masks, computed lazily and dropped on every move
+    self.pin_info = [None, None]
+    self.active_color = parsed_board['activeColor'] if parsed_board else "w"
+    self._move_list: Optional[MoveList] = None
+    # Network input bytes, built by the first `nn_input()` call and then
+    # patched square by square as pieces move
+    self._nn_bytes: Optional[bytearray] = None
+    self._nn_view: Optional[np.ndarray] = None
+
+    if parsed_board:
+      rights = parsed_board['castlingRights']
+      self.castling_rights = (
+        (WHITE_KING_SIDE if rights['whiteKingSide'] else 0) |
+        (WHITE_QUEEN_SIDE if rights['whiteQueenSide'] else 0) |
+        (BLACK_KING_SIDE if rights['blackKingSide'] else 0) |
+        (BLACK_QUEEN_SIDE if rights['blackQueenSide'] else 0)
+      )
+      target = parsed_board['enPassantTarget']
+      self.ep_square = square_index(target['row'], target['col']) if target else -1
+      self.halfmove_clock = parsed_board['halfmoveClock']
+      self.fullmove_number = parsed_board['fullmoveNumber']
+    else:
+      self.castling_rights = WHITE_KING_SIDE | WHITE_QUEEN_SIDE | BLACK_KING_SIDE | BLACK_QUEEN_SIDE
+      self.ep_square = -1
+      self.halfmove_clock = 0
+      self.fullmove_number = 1
+
+    # Undo stack: one slot per ply. It is allocated (MAX_PLY slots) on the
+    # first push, so boards that are only inspected never pay for it.
+    self.ply = 0
+    self._move_stack = array("H")
+    self._captured_stack = array("B")
+    self._captured_id_stack = array("h")
+    self._state_stack = array("L")
+    self._key_stack = array("Q")
+
+    self.zobrist_key = compute_hash(self)
+    # Legal moves, check and game-over status by Zobrist key. Opt-in: pass
+    # one cache to several boards to share positions between them.
+    self.cache = cache
+
+  @property
+  def state(self) -> List[List[Cell]]:
+    """8x8 grid of live `CellView`s over the mailbox, built on first use."""
+    if self._state is None:
+      self._state = [
+        [CellView(self, square_index(row, col)) for col in range(Board.num_col)]
+        for row in range(Board.num_row)
+      ]
+    return self._state
 
   def get_board_state(self) -> List[List[Cell]]:
     return self.state
+
+  def piece_at(self, sq: int) -> Optional[Piece]:
+    """A Piece view of the code on square `sq` (row * 8 + col), or None."""
+    code = self.squares[sq]
+    if not code:
+      return None
+    return Piece(CODE_TYPES[code], CODE_COLORS[code], (sq >> 3, sq & 7), self, self.square_ids[sq])
+
+  def set_piece(self, position: Position, piece: Optional[Piece]):
+    """
+    Puts `piece` (or nothing) on `position`, keeping bitboards, hash and
+    piece lists in sync. A piece of this board keeps its identity: one
+    still standing is moved off its current square rather than copied, and
+    a captured one being put back gets its old id again. Only pieces from
+    elsewhere get a new id.
+    """
+    sq = square_index(*position)
+    pid = -1
+    if piece is not None and piece.board is self and piece.piece_id >= 0:
+      pid = piece.piece_id
+      old_sq = self.id_squares[pid]
+      if old_sq >= 0:
+        self._drop(pid, self._lift(old_sq))
+    if self.squares[sq]:
+      captured_id = self.square_ids[sq]
+      self._drop(captured_id, self._lift(sq))
+    if piece is not None:
+      if pid < 0:
+        pid = len(self.id_squares)
+        self.id_squares.append(-1)
+      code = piece_code(piece.type, piece.color)
+      self._restore(sq, code, pid)
+    self.pin_info[0] = self.pin_info[1] = None
+
+  def legal_moves(self) -> MoveList:
+    """
+    Every legal move of the side to move, packed as 16-bit ints (see
+    `src.move_list`). The returned list is a buffer owned by the board and
+    is overwritten by the next call.
+    """
+    moves = self._move_list
+    if moves is None:
+      moves = self._move_list = MoveList()
+    cache = self.cache
+    if cache is None:
+      return generate_legal_moves(self, color_index(self.active_color), moves)
+    entry = cache.get(self.zobrist_key)
+    if entry is not None:
+      count = len(entry.moves)
+      moves.buffer[:count] = entry.moves
+      moves.count = count
+      return moves
+
+    generate_legal_moves(self, color_index(self.active_color), moves)
+    cache.put(
+      self.zobrist_key,
+      CachedPosition(moves.buffer[:moves.count], self.is_check(), moves.count == 0)
+    )
+    return moves
+
+  def is_legal(self, from_pos: Position, to_pos: Position, color: Optional[str] = None) -> bool:
+    """
+    Whether the piece on `from_pos` may legally move to `to_pos`, judged for
+    that piece's own color. Pass `color` to also require the piece to be of
+    that color (e.g. the side to move). Off-board squares, an empty
+    `from_pos` and a target holding an own piece are rejected before any
+    move generation.
+    """
+    from_row, from_col = from_pos
+    to_row, to_col = to_pos
+    if not (0 <= from_row < Board.num_row and 0 <= from_col < Board.num_col and
+            0 <= to_row < Board.num_row and 0 <= to_col < Board.num_col):
+      return False
+    from_sq = square_index(from_row, from_col)
+    to_sq = square_index(to_row, to_col)
+    code = self.squares[from_sq]
+    if not code:
+      return False
+    piece_color = (code - 1) // 6
+    if color is not None and piece_color != color_index(color):
+      return False
+    target = self.squares[to_sq]
+    if target and (target - 1) // 6 == piece_color:
+      return False
+    return is_legal_move(self, piece_color, from_sq, to_sq)
+
+  def is_check(self) -> bool:
+    """Whether the side to move is in check."""
+    if self.cache is not None:
+      entry = self.cache.peek(self.zobrist_key)
+      if entry is not None:
+        return entry.in_check
+    return bool(get_pin_info(self, color_index(self.active_color)).checkers)
+
+  def outcome(self, claim_draw: bool = False) -> Optional[Outcome]:
+    """
+    The result if the game is over, else None (see `outcome.compute_outcome`).
+    Mate/stalemate detection stops at the first legal move found, or reuses
+    the position cache if the position's moves were already generated.
+    """
+    entry = self.cache.peek(self.zobrist_key) if self.cache is not None else None
+    if entry is not None:
+      has_move = not entry.game_over
+    else:
+      has_move = has_legal_move(self, color_index(self.active_color))
+    return compute_outcome(self, has_move, claim_draw)
+
+  def is_game_over(self, claim_draw: bool = False) -> bool:
+    return self.outcome(claim_draw) is not None
   
-  def board_to_nn_input(self) -> list[int]:
+  def _place(self, sq: int, code: int, pid: int):
+    index = code - 1
+    self.squares[sq] = code
+    self.bitboards.add(sq, index)
+    self.zobrist_key ^= PIECE_KEYS[index][sq]
+    self.square_ids[sq] = pid
+    self.id_squares[pid] = sq
+    if self._nn_bytes is not None:
+      start = sq * SQUARE_INPUTS
+      self._nn_bytes[start:start + SQUARE_INPUTS] = CODE_INPUT_BYTES[code]
+    if index % 6 == KING:
+      self.king_squares[index // 6] = sq
+
+  def _lift(self, sq: int) -> int:
+    """Empties `sq` and returns its code; the caller places or drops the piece's id."""
+    code = self.squares[sq]
+    self.squares[sq] = EMPTY
+    self.bitboards.remove(sq, code - 1)
+    self.zobrist_key ^= PIECE_KEYS[code - 1][sq]
+    self.square_ids[sq] = -1
+    if self._nn_bytes is not None:
+      start = sq * SQUARE_INPUTS
+      self._nn_bytes[start:start + SQUARE_INPUTS] = CODE_INPUT_BYTES[EMPTY]
+    return code
+
+  def _shift(self, from_sq: int, to_sq: int):
+    pid = self.square_ids[from_sq]
+    self._place(to_sq, self._lift(from_sq), pid)
+
+  def _drop(self, pid: int, code: int):
+    """Takes a lifted piece off its color's piece list (a capture)."""
+    self.id_squares[pid] = -1
+    self.piece_lists[(code - 1) // 6].remove(pid)
+    if (code - 1) % 6 == KING:
+      self.king_squares[(code - 1) // 6] = -1
+
+  def _restore(self, sq: int, code: int, pid: int):
+    self._place(sq, code, pid)
+    self.piece_lists[(code - 1) // 6].append(pid)
+
+  def _grow_stacks(self):
+    extra = max(len(self._move_stack), MAX_PLY)
+    self._move_stack.extend(array("H", [0]) * extra)
+    self._captured_stack.extend(array("B", [0]) * extra)
+    self._captured_id_stack.extend(array("h", [0]) * extra)
+    self._state_stack.extend(array("L", [0]) * extra)
+    self._key_stack.extend(array("Q", [0]) * extra)
+
+  def push(self, move: int):
     """
-    Converts a 8x8 board (List[List[Cell]]) into a 448-bit input vector.
-    Each cell becomes 8 bits:
-        - 6-bit one-hot for piece type: P, N, B, R, Q, K
-        - 1-bit for color (0 = white, 1 = black)
+    Plays a packed move (see `src.move_list`) and records what is needed to
+    take it back with `pop`. Handles captures, en passant, castling (the
+    king moving two files) and promotion, and updates castling rights, the
+    en-passant square, both clocks and the side to move.
     """
-    piece_encoding = {
-        "P": [1, 0, 0, 0, 0, 0],
-        "N": [0, 1, 0, 0, 0, 0],
-        "B": [0, 0, 1, 0, 0, 0],
-        "R": [0, 0, 0, 1, 0, 0],
-        "Q": [0, 0, 0, 0, 1, 0],
-        "K": [0, 0, 0, 0, 0, 1]
-    }
+    from_sq = move & 63
+    to_sq = (move >> 6) & 63
+    promotion = move >> 12
 
-    input_vector = []
+    if self.ply == len(self._move_stack):
+      self._grow_stacks()
+    ply = self.ply
+    self._move_stack[ply] = move
+    # castling rights (4 bits) | en-passant square + 1 (7 bits) | halfmove clock
+    self._state_stack[ply] = self.castling_rights | ((self.ep_square + 1) << 4) | (self.halfmove_clock << 11)
+    self._key_stack[ply] = self.zobrist_key
+    self.zobrist_key ^= CASTLING_KEYS[self.castling_rights] ^ ep_key(self, self.ep_square, color_index(self.active_color))
 
-    for row in self.state:
-        for cell in row:
-            if cell.piece is None:
-                input_vector.extend([0]*7)  # Empty square
-            else:
-                # 6-bit one-hot
-                piece_bits = piece_encoding.get(cell.piece.type.upper(), [0]*6)
-                # 1-bit color
-                color_bit = 0 if cell.piece.color == "white" else 1
-
-                input_vector.extend(piece_bits + [color_bit])
-
-    return input_vector
+    pid = self.square_ids[from_sq]
+    code = self._lift(from_sq)
+    piece_type = (code - 1) % 6
+    is_pawn = piece_type == PAWN
+    captured = EMPTY
+    captured_sq = -1
+    if self.squares[to_sq]:
+      captured_sq = to_sq
+    elif is_pawn and to_sq == self.ep_square:
+      captured_sq = to_sq + 8 if code <= 6 else to_sq - 8
+    if captured_sq >= 0:
+      captured_id = self.square_ids[captured_sq]
+      captured = self._lift(captured_sq)
+      self._drop(captured_id, captured)
+      self._captured_id_stack[ply] = captured_id
+    self._captured_stack[ply] = captured
+
+    if promotion:
+      code += promotion  # pawn code + piece type index
+    self._place(to_sq, code, pid)
+
+    if piece_type == KING and abs(to_sq - from_sq) == 2:
+      if to_sq > from_sq:
+        self._shift(from_sq + 3, to_sq - 1)
+      else:
+        self._shift(from_sq - 4, to_sq + 1)
+
+    self.castling_rights &= CASTLING_RIGHTS_KEPT[from_sq] & CASTLING_RIGHTS_KEPT[to_sq]
+    if is_pawn and abs(to_sq - from_sq) == 16:
+      self.ep_square = (from_sq + to_sq) >> 1
+    else:
+      self.ep_square = -1
+    if is_pawn or captured:
+      self.halfmove_clock = 0
+    else:
+      self.halfmove_clock += 1
+    if self.active_color == "b":
+      self.fullmove_number += 1
+    self.active_color = "b" if self.active_color == "w" else "w"
+    self.zobrist_key ^= (
+      BLACK_TO_MOVE_KEY ^
+      CASTLING_KEYS[self.castling_rights] ^
+      ep_key(self, self.ep_square, color_index(self.active_color))
+    )
+    self.pin_info[0] = self.pin_info[1] = None
+    self.ply = ply + 1
+
+  def pop(self) -> int:
+    """Takes back the last pushed move and returns it."""
+    if self.ply == 0:
+      raise IndexError("pop from an empty move stack")
+    ply = self.ply - 1
+    move = self._move_stack[ply]
+    from_sq = move & 63
+    to_sq = (move >> 6) & 63
+    promotion = move >> 12
+
+    self.active_color = "b" if self.active_color == "w" else "w"
+    if self.active_color == "b":
+      self.fullmove_number -= 1
+    saved = self._state_stack[ply]
+    self.castling_rights = saved & 15
+    self.ep_square = ((saved >> 4) & 127) - 1
+    self.halfmove_clock = saved >> 11
+
+    pid = self.square_ids[to_sq]
+    code = self._lift(to_sq)
+    if promotion:
+      code -= promotion
+    self._place(from_sq, code, pid)
+    piece_type = (code - 1) % 6
+
+    if piece_type == KING and abs(to_sq - from_sq) == 2:
+      if to_sq > from_sq:
+        self._shift(to_sq - 1, from_sq + 3)
+      else:
+        self._shift(to_sq + 1, from_sq - 4)
+
+    captured = self._captured_stack[ply]
+    if captured:
+      captured_id = self._captured_id_stack[ply]
+      if piece_type == PAWN and to_sq == self.ep_square:
+        self._restore(to_sq + 8 if code <= 6 else to_sq - 8, captured, captured_id)
+      else:
+        self._restore(to_sq, captured, captured_id)
+
+    self.zobrist_key = self._key_stack[ply]
+    self.pin_info[0] = self.pin_info[1] = None
+    self.ply = ply
+    return move
+
+  def nn_input(self) -> np.ndarray:
+    """
+    The `board_to_nn_input()` vector (uint8), kept up to date incrementally:
+    after the first call, every square a move touches rewrites only its own
+    7 inputs. The array is a live view owned by the board, so copy it to
+    keep a snapshot.
+    """
+    if self._nn_view is None:
+      self._nn_bytes = bytearray(encode_squares(self.squares).tobytes())
+      self._nn_view = np.frombuffer(self._nn_bytes, dtype=np.uint8)
+    return self._nn_view
+
+  def board_to_nn_input(self, dtype=np.uint8) -> np.ndarray:
+    """
+    Converts the board into a 448-element input vector (see `src.nn_input`).
+    Each square, a8 first, becomes 7 inputs:
+        - 6-bit one-hot for piece type: P, N, B, R, Q, K
+        - 1-bit for color (0 = white, 1 = black)
+    """
+    return encode_squares(self.squares, dtype)
   
   def get_board_state_nn(self) -> List[List[Optional[str]]]:
     board_state = []
@@ -118,9 +506,9 @@ class Board:
     ):
       return None
 
-    captured_piece = self.state[to_row][to_col].piece
-    self.state[to_row][to_col].piece = piece
-    self.state[from_row][from_col].piece = original_piece
+    captured_piece = self.piece_at(square_index(to_row, to_col))
+    self.set_piece(to_pos, piece)
+    self.set_piece(from_pos, original_piece)
     return captured_piece
   
   def move_piece_nn(self, from_square: float, to_square: float) -> Optional[Piece]:
@@ -140,19 +528,19 @@ class Board:
     if not (0 <= from_row < Board.num_row and 0 <= from_col < Board.num_col and
             0 <= to_row < Board.num_row and 0 <= to_col < Board.num_col):
       return -1
-    piece = self.state[from_row][from_col].piece
+    code = self.squares[square_index(from_row, from_col)]
 
-    if piece is None:
+    if not code:
       # No piece to move
       return -0.5
-    legal_moves = piece.get_legal_moves(self, check_for_pin=True)
-    if (to_row, to_col) not in legal_moves:
+    if not self.is_legal((from_row, from_col), (to_row, to_col)):
       # no legal moves, but was able to find a piece
       return 0
-    if self.state[to_row][to_col].piece is None:
+    target = self.squares[square_index(to_row, to_col)]
+    if not target:
       # Moving to an empty square
       return 1
-    elif self.state[to_row][to_col].piece.color != piece.color:
+    elif (target - 1) // 6 != (code - 1) // 6:
       # Capturing an opponent's piece
       return 2
     return 0
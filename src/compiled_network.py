@@ -0,0 +1,311 @@
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+from neat.graphs import feed_forward_layers
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    # Same scaling and clamping as neat.activations.sigmoid_activation
+    return 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0)))
+
+
+def _tanh(z: np.ndarray) -> np.ndarray:
+    return np.tanh(np.clip(2.5 * z, -60.0, 60.0))
+
+
+def _relu(z: np.ndarray) -> np.ndarray:
+    return np.maximum(z, 0.0)
+
+
+def _identity(z: np.ndarray) -> np.ndarray:
+    return z
+
+
+# NumPy versions of the neat activation functions the project can use
+ACTIVATIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "sigmoid": _sigmoid,
+    "tanh": _tanh,
+    "relu": _relu,
+    "identity": _identity,
+}
+
+
+class Layer:
+    """
+    One feed-forward layer: `sources` are the value columns it reads,
+    `targets` the columns it writes, `weights` is (len(sources), len(targets)).
+    `node_sources`/`node_weights` are the same minus the input rows, for
+    the sparse path. Nodes are grouped by activation so each function runs
+    once per layer.
+    """
+
+    __slots__ = (
+        "sources", "targets", "weights", "node_sources", "node_weights",
+        "bias", "response", "activations",
+    )
+
+    def __init__(
+        self,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        response: np.ndarray,
+        activations: List[Tuple[Callable[[np.ndarray], np.ndarray], np.ndarray]],
+        num_inputs: int
+    ):
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+        self.node_sources = sources[sources >= num_inputs]
+        self.node_weights = weights[sources >= num_inputs]
+        self.bias = bias
+        self.response = response
+        self.activations = activations
+
+    def activate(self, z: np.ndarray) -> np.ndarray:
+        """Applies each node's activation to its column of the (N, len(targets)) sums."""
+        for activation, idx in self.activations:
+            if len(idx) == z.shape[1]:
+                return activation(z)
+            z[:, idx] = activation(z[:, idx])
+        return z
+
+
+class CompiledNetwork:
+    """
+    A neat feed-forward phenotype compiled to NumPy: the genome's layers (as
+    found by `neat.graphs.feed_forward_layers`) become dense weight matrices,
+    so a whole batch of inputs is activated with one matrix product per
+    layer. Outputs match `neat.nn.FeedForwardNetwork` up to float rounding.
+
+    Node values live in the columns of a (batch, num_columns) array: the
+    inputs first, then every evaluated node in layer order, then one column
+    that stays 0 for outputs the network never computes.
+
+    For binary inputs with few ones (a board has at most 64 of 448 set),
+    `activate_sparse` skips the input rows of the weight matrices and adds
+    up, per active input, the row of `input_adjacency` listing the weight
+    from that input to every node column.
+    """
+
+    def __init__(
+        self,
+        num_inputs: int,
+        num_columns: int,
+        layers: List[Layer],
+        output_columns: np.ndarray,
+        input_adjacency: np.ndarray
+    ):
+        self.num_inputs = num_inputs
+        self.num_columns = num_columns
+        self.layers = layers
+        self.output_columns = output_columns
+        # (num_inputs + 1, num_columns - num_inputs); the extra all-zero row
+        # is what padding indices (== num_inputs) point at
+        self.input_adjacency = input_adjacency
+
+    @staticmethod
+    def create(genome, config) -> 'CompiledNetwork':
+        """Receives a genome and returns its compiled phenotype."""
+        genome_config = config.genome_config
+        input_keys = genome_config.input_keys
+        output_keys = genome_config.output_keys
+        connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+        layers = feed_forward_layers(input_keys, output_keys, connections)
+
+        column = {key: i for i, key in enumerate(input_keys)}
+        for layer in layers:
+            for node in sorted(layer):
+                column[node] = len(column)
+        zero_column = len(column)
+
+        incoming: Dict[int, List[Tuple[int, float]]] = {}
+        for key in connections:
+            inode, onode = key
+            incoming.setdefault(onode, []).append((inode, genome.connections[key].weight))
+
+        num_inputs = len(input_keys)
+        input_adjacency = np.zeros((num_inputs + 1, zero_column + 1 - num_inputs))
+        compiled = []
+        for layer in layers:
+            nodes = sorted(layer)
+            sources = sorted({column[inode] for node in nodes for inode, _ in incoming.get(node, ())})
+            row = {col: i for i, col in enumerate(sources)}
+            weights = np.zeros((len(sources), len(nodes)))
+            by_activation: Dict[str, List[int]] = {}
+            for j, node in enumerate(nodes):
+                for inode, weight in incoming.get(node, ()):
+                    weights[row[column[inode]], j] += weight
+                    if column[inode] < num_inputs:
+                        input_adjacency[column[inode], column[node] - num_inputs] += weight
+                gene = genome.nodes[node]
+                if gene.aggregation != "sum":
+                    raise ValueError(f"Unsupported aggregation {gene.aggregation!r} on node {node}")
+                if gene.activation not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation {gene.activation!r} on node {node}")
+                by_activation.setdefault(gene.activation, []).append(j)
+            compiled.append(Layer(
+                np.array(sources, dtype=np.intp),
+                np.array([column[node] for node in nodes], dtype=np.intp),
+                weights,
+                np.array([genome.nodes[node].bias for node in nodes]),
+                np.array([genome.nodes[node].response for node in nodes]),
+                [(ACTIVATIONS[name], np.array(idx, dtype=np.intp)) for name, idx in by_activation.items()],
+                num_inputs,
+            ))
+
+        output_columns = np.array([column.get(key, zero_column) for key in output_keys], dtype=np.intp)
+        return CompiledNetwork(num_inputs, zero_column + 1, compiled, output_columns, input_adjacency)
+
+    def activate_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Activates the network on every row of `X`.
+
+        Args:
+            X (np.ndarray): (N, num_inputs) inputs, e.g. from `nn_input.encode_batch`.
+
+        Returns:
+            np.ndarray: (N, num_outputs) float64 outputs.
+        """
+        if X.ndim != 2 or X.shape[1] != self.num_inputs:
+            raise RuntimeError(f"Expected (N, {self.num_inputs}) inputs, got {X.shape}")
+        values = np.zeros((X.shape[0], self.num_columns))
+        values[:, :self.num_inputs] = X
+        for layer in self.layers:
+            z = layer.bias + layer.response * (values[:, layer.sources] @ layer.weights)
+            values[:, layer.targets] = layer.activate(z)
+        return values[:, self.output_columns]
+
+    def activate_sparse_batch(self, active: np.ndarray) -> np.ndarray:
+        """
+        Like `activate_batch` for binary inputs given by their set indices.
+
+        Args:
+            active (np.ndarray): (N, K) input indices per row, padded with
+                `num_inputs` (see `nn_input.active_input_batch`).
+
+        Returns:
+            np.ndarray: (N, num_outputs) float64 outputs.
+        """
+        num_inputs = self.num_inputs
+        values = np.zeros((active.shape[0], self.num_columns))
+        # Input contribution to every node column, from the active rows only
+        from_inputs = self.input_adjacency[active].sum(axis=1)
+        for layer in self.layers:
+            z = from_inputs[:, layer.targets - num_inputs]
+            if len(layer.node_sources):
+                z = z + values[:, layer.node_sources] @ layer.node_weights
+            values[:, layer.targets] = layer.activate(layer.bias + layer.response * z)
+        return values[:, self.output_columns]
+
+    def activate_sparse(self, active: Sequence[int]) -> List[float]:
+        """Single-position `activate_sparse_batch`, e.g. on `nn_input.active_inputs(board)`."""
+        return self.activate_sparse_batch(np.asarray(active, dtype=np.intp).reshape(1, -1))[0].tolist()
+
+    def activate(self, inputs: Sequence[float]) -> List[float]:
+        """Single-input counterpart of `activate_batch`, shaped like `FeedForwardNetwork.activate`."""
+        return self.activate_batch(np.asarray(inputs, dtype=np.float64).reshape(1, -1))[0].tolist()
+
+
+class StackedNetworks:
+    """
+    The compiled networks of many genomes packed into padded tensors, so a
+    whole generation is activated with one batched matrix product per layer
+    instead of one small product per genome.
+
+    Genome g's node columns (everything but its inputs) become the first
+    columns of row g, padded to the widest genome; padding and outputs
+    that are never computed stay 0. Layer l holds, per genome, the weights
+    into the nodes of that genome's l-th layer and a mask of those nodes.
+    """
+
+    def __init__(self, networks: Sequence[CompiledNetwork]):
+        if not networks:
+            raise ValueError("No networks to stack")
+        num_inputs = networks[0].num_inputs
+        if any(net.num_inputs != num_inputs for net in networks):
+            raise ValueError("Stacked networks must have the same number of inputs")
+        count = len(networks)
+        width = max(net.num_columns - num_inputs for net in networks)
+        depth = max(len(net.layers) for net in networks)
+        num_outputs = len(networks[0].output_columns)
+
+        self.num_inputs = num_inputs
+        self.input_adjacency = np.zeros((count, num_inputs + 1, width))
+        self.layer_weights = np.zeros((depth, count, width, width))
+        self.layer_masks = np.zeros((depth, count, width), dtype=bool)
+        self.bias = np.zeros((count, width))
+        self.response = np.zeros((count, width))
+        self.output_columns = np.zeros((count, num_outputs), dtype=np.intp)
+        activation_masks: Dict[Callable[[np.ndarray], np.ndarray], np.ndarray] = {}
+
+        for g, net in enumerate(networks):
+            columns = net.num_columns - num_inputs
+            self.input_adjacency[g, :, :columns] = net.input_adjacency
+            self.output_columns[g] = net.output_columns - num_inputs
+            for l, layer in enumerate(net.layers):
+                targets = layer.targets - num_inputs
+                sources = layer.node_sources - num_inputs
+                self.layer_weights[l, g][np.ix_(sources, targets)] = layer.node_weights
+                self.layer_masks[l, g, targets] = True
+                self.bias[g, targets] = layer.bias
+                self.response[g, targets] = layer.response
+                for activation, idx in layer.activations:
+                    mask = activation_masks.get(activation)
+                    if mask is None:
+                        mask = activation_masks[activation] = np.zeros((count, width), dtype=bool)
+                    mask[g, targets[idx]] = True
+        self.activation_masks = list(activation_masks.items())
+
+    def take(self, genomes: Sequence[int]) -> 'StackedNetworks':
+        """The stack restricted to `genomes` (indices into this stack), in that order."""
+        genomes = np.asarray(genomes, dtype=np.intp)
+        taken = StackedNetworks.__new__(StackedNetworks)
+        taken.num_inputs = self.num_inputs
+        taken.input_adjacency = self.input_adjacency[genomes]
+        taken.layer_weights = self.layer_weights[:, genomes]
+        taken.layer_masks = self.layer_masks[:, genomes]
+        taken.bias = self.bias[genomes]
+        taken.response = self.response[genomes]
+        taken.output_columns = self.output_columns[genomes]
+        taken.activation_masks = [(activation, mask[genomes]) for activation, mask in self.activation_masks]
+        return taken
+
+    def _run_layers(self, from_inputs: np.ndarray) -> np.ndarray:
+        # from_inputs: (G, N, width) input contribution to every node column
+        values = np.zeros_like(from_inputs)
+        bias = self.bias[:, None, :]
+        response = self.response[:, None, :]
+        single = len(self.activation_masks) == 1
+        for weights, mask in zip(self.layer_weights, self.layer_masks):
+            z = bias + response * (from_inputs + values @ weights)
+            if single:
+                z = self.activation_masks[0][0](z)
+            else:
+                out = np.zeros_like(z)
+                for activation, act_mask in self.activation_masks:
+                    out = np.where(act_mask[:, None, :], activation(z), out)
+                z = out
+            values = np.where(mask[:, None, :], z, values)
+        return np.take_along_axis(values, self.output_columns[:, None, :], axis=2)
+
+    def activate_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Activates genome g on every row of X[g].
+
+        Args:
+            X (np.ndarray): (G, N, num_inputs) inputs.
+
+        Returns:
+            np.ndarray: (G, N, num_outputs) outputs.
+        """
+        return self._run_layers(X @ self.input_adjacency[:, :self.num_inputs, :])
+
+    def activate_sparse_batch(self, active: np.ndarray) -> np.ndarray:
+        """
+        `activate_batch` for binary inputs given as (G, N, K) set indices,
+        padded with `num_inputs` (see `nn_input.active_input_batch`).
+        """
+        genomes = np.arange(active.shape[0])[:, None, None]
+        return self._run_layers(self.input_adjacency[genomes, active].sum(axis=2))
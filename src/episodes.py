@@ -0,0 +1,140 @@
+import random
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .board import Board
+from .compiled_network import CompiledNetwork, StackedNetworks
+from .move_list import encode_move
+from .nn_input import MAX_ACTIVE_INPUTS, NN_INPUT_SIZE, active_inputs, decode_output
+from .utils import random_fens
+from .utils.parse_fen import parse_fen
+
+
+def new_board(fens: Optional[Sequence[str]] = None, rng=random) -> Board:
+    """A board on a random FEN from `fens` (default: the `random_fens` corpus)."""
+    fen = rng.choice(fens) if fens else random_fens.get_random_fen()
+    return Board(fen, parse_fen(fen))
+
+
+def play_output(board: Board, output: Sequence[float], rng=random) -> float:
+    """
+    Plays the network's move on `board`, or a random legal move if the
+    network's move is illegal, and returns the fitness it earns.
+    """
+    from_sq, to_sq = decode_output(output)
+    move = encode_move(from_sq, to_sq)
+    legal_moves = board.legal_moves()
+    piece = board.squares[from_sq]
+    fitness = 0.0
+    if piece:
+        fitness += 1  # Found a piece
+
+        if move in legal_moves:
+            target = board.squares[to_sq]
+            if target and (target - 1) // 6 != (piece - 1) // 6:
+                fitness += 6  # Captured opponent piece
+            else:
+                fitness += 3  # Legal non-capturing move
+
+            board.push(move)
+        else:
+            if legal_moves:
+                board.push(rng.choice(legal_moves))
+            fitness -= 1  # Illegal move
+    else:
+        if legal_moves:
+            board.push(rng.choice(legal_moves))
+        fitness -= 0.5  # Mild penalty for invalid move
+    return fitness
+
+
+class EpisodeRunner:
+    """
+    Fitness function for `neat.Population.run` that plays every game of a
+    generation in lockstep: G genomes x `runs_per_net` games are held as
+    one batch of boards, encoded together, activated with one
+    `StackedNetworks` call per layer, and scored one ply at a time. Games
+    that end (game over or `max_steps` plies) are retired from the batch:
+    each genome's row only holds its games still playing, padded to the
+    longest row, and genomes whose games are all over are dropped from the
+    stack in batches (once a quarter of it is done).
+
+    A genome's fitness is its average over its games, as in the per-genome
+    `eval_genome` loop it replaces.
+
+    Args:
+        runs_per_net (int): Games per genome.
+        max_steps (int): Plies per game at most.
+        fens (Sequence[str], optional): Starting positions to draw from;
+            defaults to the `random_fens` corpus.
+        rng (random.Random, optional): Source of starting positions and
+            random replacement moves; defaults to the `random` module.
+    """
+
+    def __init__(
+        self,
+        runs_per_net: int = 5,
+        max_steps: int = 40,
+        fens: Optional[Sequence[str]] = None,
+        rng: Optional[random.Random] = None
+    ):
+        self.runs_per_net = runs_per_net
+        self.max_steps = max_steps
+        self.fens = fens
+        self.rng = rng if rng is not None else random
+        # Plies each network played in the last `play` call
+        self.plies: List[int] = []
+
+    def play(self, networks: Sequence[CompiledNetwork]) -> List[float]:
+        """Plays all games of `networks` and returns each network's fitness."""
+        runs = self.runs_per_net
+        plies = self.plies = [0] * len(networks)
+        stacked = StackedNetworks(networks)
+        # Genome g of the batch is `stacked_genomes[g]`; the stack is cut
+        # down once a quarter of its genomes have finished all their games
+        stacked_genomes = list(range(len(networks)))
+        boards = [[new_board(self.fens, self.rng) for _ in range(runs)] for _ in networks]
+        totals = [0.0] * len(networks)
+        buffer = np.empty((len(networks), runs, MAX_ACTIVE_INPUTS), dtype=np.intp)
+
+        playing: List[Tuple[int, int]] = [
+            (g, r) for g in range(len(networks)) for r in range(runs)
+            if not boards[g][r].is_game_over()
+        ]
+        steps = 0
+        while playing and steps < self.max_steps:
+            live = sorted({g for g, _ in playing})
+            if len(live) * 4 <= len(stacked_genomes) * 3:
+                position = {g: i for i, g in enumerate(stacked_genomes)}
+                stacked = stacked.take([position[g] for g in live])
+                stacked_genomes = live
+            row_of = {g: i for i, g in enumerate(stacked_genomes)}
+
+            # Each genome's games still playing fill the first columns of its row
+            slots = [0] * len(stacked_genomes)
+            placed = []
+            for g, r in playing:
+                row = row_of[g]
+                placed.append((row, slots[row]))
+                slots[row] += 1
+            active = buffer[:len(stacked_genomes), :max(slots)]
+            active.fill(NN_INPUT_SIZE)
+            for (g, r), (row, slot) in zip(playing, placed):
+                indices = active_inputs(boards[g][r])
+                active[row, slot, :len(indices)] = indices
+
+            outputs = stacked.activate_sparse_batch(active)
+            for (g, r), (row, slot) in zip(playing, placed):
+                totals[g] += play_output(boards[g][r], outputs[row, slot], self.rng)
+                plies[g] += 1
+            playing = [(g, r) for g, r in playing if not boards[g][r].is_game_over()]
+            steps += 1
+
+        return [total / runs for total in totals]
+
+    def __call__(self, genomes, config):
+        genomes = list(genomes)
+        networks = [CompiledNetwork.create(genome, config) for _, genome in genomes]
+        for (genome_id, genome), fitness in zip(genomes, self.play(networks)):
+            genome.fitness = fitness
@@ -0,0 +1,240 @@
+import multiprocessing
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import neat
+import numpy as np
+
+from .compiled_network import CompiledNetwork
+from .episodes import EpisodeRunner
+from .utils import random_fens
+
+# A genome reduced to what `CompiledNetwork.create` reads: node keys, bias,
+# response, activation and aggregation names, and the enabled connections
+# as an (n, 2) key array plus weights.
+PackedGenome = Tuple[np.ndarray, np.ndarray, np.ndarray, Tuple[str, ...], Tuple[str, ...], np.ndarray, np.ndarray]
+
+
+class _NodeSpec:
+    __slots__ = ("bias", "response", "activation", "aggregation")
+
+    def __init__(self, bias: float, response: float, activation: str, aggregation: str):
+        self.bias = bias
+        self.response = response
+        self.activation = activation
+        self.aggregation = aggregation
+
+
+class _ConnectionSpec:
+    __slots__ = ("key", "weight", "enabled")
+
+    def __init__(self, key: Tuple[int, int], weight: float):
+        self.key = key
+        self.weight = weight
+        self.enabled = True
+
+
+class _GenomeSpec:
+    """Just enough of a `DefaultGenome` for `CompiledNetwork.create`."""
+
+    __slots__ = ("nodes", "connections")
+
+    def __init__(self, nodes: Dict[int, _NodeSpec], connections: Dict[Tuple[int, int], _ConnectionSpec]):
+        self.nodes = nodes
+        self.connections = connections
+
+
+def pack_genome(genome) -> PackedGenome:
+    """Compact, cheaply pickled form of a genome; disabled connections are left out."""
+    keys = sorted(genome.nodes)
+    nodes = [genome.nodes[key] for key in keys]
+    connections = [cg for cg in genome.connections.values() if cg.enabled]
+    return (
+        np.array(keys, dtype=np.int64),
+        np.array([node.bias for node in nodes]),
+        np.array([node.response for node in nodes]),
+        tuple(node.activation for node in nodes),
+        tuple(node.aggregation for node in nodes),
+        np.array([cg.key for cg in connections], dtype=np.int64).reshape(-1, 2),
+        np.array([cg.weight for cg in connections]),
+    )
+
+
+def unpack_genome(packed: PackedGenome) -> _GenomeSpec:
+    keys, bias, response, activations, aggregations, connection_keys, weights = packed
+    nodes = {
+        int(key): _NodeSpec(float(b), float(r), activation, aggregation)
+        for key, b, r, activation, aggregation in zip(keys, bias, response, activations, aggregations)
+    }
+    connections = {}
+    for (inode, onode), weight in zip(connection_keys.tolist(), weights.tolist()):
+        connections[(inode, onode)] = _ConnectionSpec((inode, onode), weight)
+    return _GenomeSpec(nodes, connections)
+
+
+# Per-worker state, set up once by `_init_worker`
+_worker_config: Optional[neat.Config] = None
+_worker_runner: Optional[EpisodeRunner] = None
+
+
+def _init_worker(config_path: str, runs_per_net: int, max_steps: int):
+    global _worker_config, _worker_runner
+    # Forked workers inherit the parent's random state; give each its own.
+    random.seed()
+    _worker_config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                 neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                 config_path)
+    _worker_runner = EpisodeRunner(runs_per_net, max_steps, random_fens.random_fens)
+
+
+def _evaluate_chunk(chunk: List[Tuple[int, PackedGenome]]) -> List[Tuple[int, float, float]]:
+    """(genome id, fitness, seconds) per genome; the chunk's time is split by plies played."""
+    start = time.perf_counter()
+    networks = [CompiledNetwork.create(unpack_genome(packed), _worker_config) for _, packed in chunk]
+    fitnesses = _worker_runner.play(networks)
+    seconds = time.perf_counter() - start
+    plies = _worker_runner.plies
+    per_ply = seconds / max(sum(plies), 1)
+    return [
+        (genome_id, fitness, per_ply * max(count, 1))
+        for (genome_id, _), fitness, count in zip(chunk, fitnesses, plies)
+    ]
+
+
+def genome_size(packed: PackedGenome) -> Tuple[int, int]:
+    """(nodes, enabled connections) of a packed genome."""
+    return len(packed[0]), len(packed[5])
+
+
+class CostModel:
+    """
+    Predicts how long a genome takes to evaluate. A genome measured in the
+    previous generation (an elite, carried over unchanged) is predicted to
+    cost what it cost then; any other genome gets a linear fit of measured
+    cost on (1, nodes, connections) over the previous generation, or just
+    its size before anything has been measured.
+    """
+
+    def __init__(self):
+        self.coefficients: Optional[np.ndarray] = None
+        self.history: Dict[int, float] = {}
+
+    def estimate(self, genome_id: int, packed: PackedGenome) -> float:
+        cost = self.history.get(genome_id)
+        if cost is not None:
+            return cost
+        nodes, connections = genome_size(packed)
+        if self.coefficients is None:
+            return 1.0 + nodes + connections
+        return max(float(self.coefficients @ (1.0, nodes, connections)), 1e-6)
+
+    def update(self, sizes: Dict[int, Tuple[int, int]], costs: Dict[int, float]):
+        """Refits on one generation's measured `costs` (seconds by genome id)."""
+        self.history = dict(costs)
+        if len(costs) < 3:
+            return
+        ids = list(costs)
+        features = np.array([(1.0,) + sizes[genome_id] for genome_id in ids])
+        measured = np.array([costs[genome_id] for genome_id in ids])
+        self.coefficients = np.linalg.lstsq(features, measured, rcond=None)[0]
+
+
+class WarmPoolEvaluator:
+    """
+    Parallel fitness function for `neat.Population.run` with long-lived
+    workers. Each worker loads the NEAT config, the FEN corpus and the move
+    generator's tables once, when the pool starts. After that, a task is a
+    chunk of (genome id, `pack_genome` arrays) pairs, and the worker plays
+    all of them in lockstep with an `EpisodeRunner`.
+
+    Chunks are scheduled by estimated cost (see `CostModel`): genomes are
+    sorted most expensive first and cut into chunks whose cost shrinks as
+    the generation drains (guided self-scheduling), then queued in that
+    order. Idle workers take the next chunk from the shared queue, so
+    expensive work starts early and the small chunks at the end fill in
+    behind stragglers instead of waiting on one slow worker.
+
+    Args:
+        config_path (str): The NEAT config file, loaded by every worker.
+        processes (int, optional): Worker count; defaults to the CPU count.
+        runs_per_net (int): Games per genome.
+        max_steps (int): Plies per game at most.
+        chunks_per_worker (int): Divides the remaining cost to size each
+            chunk: a chunk takes about remaining / (processes *
+            chunks_per_worker). Larger values balance load better, smaller
+            ones amortize the per-task overhead and make bigger lockstep
+            batches.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        processes: Optional[int] = None,
+        runs_per_net: int = 5,
+        max_steps: int = 40,
+        chunks_per_worker: int = 4
+    ):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunks_per_worker = chunks_per_worker
+        self.cost_model = CostModel()
+        self.pool = multiprocessing.Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(config_path, runs_per_net, max_steps),
+        )
+
+    def schedule(self, tasks: Sequence[Tuple[int, PackedGenome]]) -> List[list]:
+        """Splits tasks into chunks, most expensive first, with chunk cost shrinking as they run out."""
+        costs = [self.cost_model.estimate(genome_id, packed) for genome_id, packed in tasks]
+        order = sorted(range(len(tasks)), key=costs.__getitem__, reverse=True)
+        remaining = sum(costs)
+        slots = self.processes * self.chunks_per_worker
+        chunks = []
+        chunk: list = []
+        chunk_cost = 0.0
+        target = remaining / slots
+        for i in order:
+            chunk.append(tasks[i])
+            chunk_cost += costs[i]
+            if chunk_cost >= target:
+                chunks.append(chunk)
+                remaining -= chunk_cost
+                chunk, chunk_cost = [], 0.0
+                target = remaining / slots
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def submit(self, tasks: Sequence[Tuple[int, PackedGenome]], callback, error_callback=None):
+        """
+        Queues one chunk of (genome id, packed genome) tasks without waiting
+        for it. `callback` gets the chunk's [(genome id, fitness, seconds)]
+        (or `error_callback` the exception) on one of the pool's threads.
+        """
+        return self.pool.apply_async(_evaluate_chunk, (list(tasks),), callback=callback, error_callback=error_callback)
+
+    def evaluate(self, genomes, config):
+        genomes = dict(genomes)
+        tasks = [(genome_id, pack_genome(genome)) for genome_id, genome in genomes.items()]
+        costs: Dict[int, float] = {}
+        for results in self.pool.imap_unordered(_evaluate_chunk, self.schedule(tasks)):
+            for genome_id, fitness, seconds in results:
+                genomes[genome_id].fitness = fitness
+                costs[genome_id] = seconds
+        self.cost_model.update({genome_id: genome_size(packed) for genome_id, packed in tasks}, costs)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        """Stops the workers at once, dropping queued and running chunks."""
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self) -> 'WarmPoolEvaluator':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,153 @@
+from typing import List, Tuple
+
+from ..bitboard import SQUARE_BB, WHITE, BLACK
+
+# Per-square attack and ray tables, built once at import so the move
+# generators only do table reads and bit operations in the hot loop.
+
+SQUARE_COORDS: List[Tuple[int, int]] = [divmod(sq, 8) for sq in range(64)]
+
+# Ray directions as (row step, col step). Row 0 is rank 8, so "north"
+# decreases the row and the square index. Opposite directions are paired so
+# that `direction ^ 1` flips a ray.
+NORTH, SOUTH, EAST, WEST, NORTH_EAST, SOUTH_WEST, NORTH_WEST, SOUTH_EAST = range(8)
+DIRECTIONS: List[Tuple[int, int]] = [
+    (-1, 0),
+    (1, 0),
+    (0, 1),
+    (0, -1),
+    (-1, 1),
+    (1, -1),
+    (-1, -1),
+    (1, 1),
+]
+ROOK_DIRECTIONS = (NORTH, SOUTH, EAST, WEST)
+BISHOP_DIRECTIONS = (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+# Rays whose squares increase in index from the origin; the nearest blocker
+# on them is the lowest set bit, on the others it is the highest.
+POSITIVE_DIRECTIONS = frozenset((SOUTH, EAST, SOUTH_EAST, SOUTH_WEST))
+
+KNIGHT_OFFSETS = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+KING_OFFSETS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+# Pawns move towards row 0 for white and towards row 7 for black.
+PAWN_DIRECTION = {WHITE: -1, BLACK: 1}
+PAWN_START_ROW = {WHITE: 6, BLACK: 1}
+# Row a pawn of each color promotes on: row 0 (rank 8) for white, row 7 for black
+PROMOTION_ROWS = [0xFF, 0xFF << 56]
+
+
+def _offset_mask(sq: int, offsets: List[Tuple[int, int]]) -> int:
+    row, col = divmod(sq, 8)
+    mask = 0
+    for d_row, d_col in offsets:
+        r, c = row + d_row, col + d_col
+        if 0 <= r < 8 and 0 <= c < 8:
+            mask |= SQUARE_BB[r * 8 + c]
+    return mask
+
+
+def _ray_squares(sq: int, direction: int) -> Tuple[int, ...]:
+    d_row, d_col = DIRECTIONS[direction]
+    row, col = divmod(sq, 8)
+    squares = []
+    r, c = row + d_row, col + d_col
+    while 0 <= r < 8 and 0 <= c < 8:
+        squares.append(r * 8 + c)
+        r, c = r + d_row, c + d_col
+    return tuple(squares)
+
+
+KNIGHT_ATTACKS: List[int] = [_offset_mask(sq, KNIGHT_OFFSETS) for sq in range(64)]
+KING_ATTACKS: List[int] = [_offset_mask(sq, KING_OFFSETS) for sq in range(64)]
+PAWN_ATTACKS: List[List[int]] = [
+    [_offset_mask(sq, [(PAWN_DIRECTION[color], -1), (PAWN_DIRECTION[color], 1)]) for sq in range(64)]
+    for color in (WHITE, BLACK)
+]
+
+RAY_SQUARES: List[List[Tuple[int, ...]]] = [
+    [_ray_squares(sq, direction) for sq in range(64)] for direction in range(8)
+]
+RAY_MASKS: List[List[int]] = [
+    [sum(SQUARE_BB[s] for s in squares) for squares in direction_squares]
+    for direction_squares in RAY_SQUARES
+]
+
+
+def _between_and_line(a: int, b: int) -> Tuple[int, int]:
+    for direction in range(8):
+        squares = RAY_SQUARES[direction][a]
+        if b in squares:
+            between = sum(SQUARE_BB[s] for s in squares[:squares.index(b)])
+            opposite = direction ^ 1
+            line = RAY_MASKS[direction][a] | RAY_MASKS[opposite][a] | SQUARE_BB[a]
+            return between, line
+    return 0, 0
+
+
+# BETWEEN[a][b]: squares strictly between a and b if they share a rank, file
+# or diagonal. LINE[a][b]: the whole line through both squares. Both are 0
+# for unaligned pairs.
+_ALIGNMENT = [[_between_and_line(a, b) for b in range(64)] for a in range(64)]
+BETWEEN: List[List[int]] = [[pair[0] for pair in row] for row in _ALIGNMENT]
+LINE: List[List[int]] = [[pair[1] for pair in row] for row in _ALIGNMENT]
+del _ALIGNMENT
+
+
+def ray_attacks(sq: int, direction: int, occupied: int) -> int:
+    """
+    Squares attacked from `sq` along one ray, up to and including the first
+    occupied square.
+    """
+    ray = RAY_MASKS[direction][sq]
+    blockers = ray & occupied
+    if not blockers:
+        return ray
+    if direction in POSITIVE_DIRECTIONS:
+        blocker = (blockers & -blockers).bit_length() - 1
+    else:
+        blocker = blockers.bit_length() - 1
+    return ray ^ RAY_MASKS[direction][blocker]
+
+
+def rook_ray_attacks(sq: int, occupied: int) -> int:
+    """Reference ray walk; `magics.rook_attacks` is the fast lookup built from it."""
+    return (
+        ray_attacks(sq, NORTH, occupied) |
+        ray_attacks(sq, SOUTH, occupied) |
+        ray_attacks(sq, EAST, occupied) |
+        ray_attacks(sq, WEST, occupied)
+    )
+
+
+def bishop_ray_attacks(sq: int, occupied: int) -> int:
+    """Reference ray walk; `magics.bishop_attacks` is the fast lookup built from it."""
+    return (
+        ray_attacks(sq, NORTH_EAST, occupied) |
+        ray_attacks(sq, NORTH_WEST, occupied) |
+        ray_attacks(sq, SOUTH_EAST, occupied) |
+        ray_attacks(sq, SOUTH_WEST, occupied)
+    )
+
+
+def pawn_push_targets(sq: int, color: int, occupied: int) -> int:
+    """Single push, plus the double push from the start row, onto empty squares."""
+    row = sq >> 3
+    step = 8 * PAWN_DIRECTION[color]
+    one = sq + step
+    if not 0 <= one < 64 or occupied & SQUARE_BB[one]:
+        return 0
+    targets = SQUARE_BB[one]
+    if row == PAWN_START_ROW[color] and not occupied & SQUARE_BB[one + step]:
+        targets |= SQUARE_BB[one + step]
+    return targets
+
+
+def targets_to_coords(targets: int) -> List[Tuple[int, int]]:
+    """Expands a target bitboard into (row, col) positions, lowest square first."""
+    moves = []
+    while targets:
+        lsb = targets & -targets
+        moves.append(SQUARE_COORDS[lsb.bit_length() - 1])
+        targets ^= lsb
+    return moves
@@ -1,5 +1,9 @@
-from typing import List, Tuple, TYPE_CHECKING
-from ..utils.filter_out_pinned_moves import filter_out_pinned_moves
+from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from ..bitboard import color_index
+from .attack_tables import targets_to_coords
+from .magics import bishop_attacks
+from .pins import legal_target_mask
+from ..move_list import MoveList
 
 if TYPE_CHECKING:
     from ..board import Board
@@ -8,67 +12,19 @@ if TYPE_CHECKING:
 def all_bishop_moves(
     piece: 'Piece',
     board: 'Board',
-    check_for_pin: bool = False
-) -> List[Tuple[int, int]]:
-    from ..board import Board
-    moves: List[Tuple[int, int]] = []
-    state = board.get_board_state()
+    check_for_pin: bool = False,
+    moves: Optional[MoveList] = None
+) -> Union[List[Tuple[int, int]], MoveList]:
+    own = board.bitboards.occupancy[color_index(piece.color)]
     m, n = piece.position
+    sq = m * 8 + n
 
-    # Run through all 4 diagonals of the bishop
-    i, j = m + 1, n + 1
-    while i < Board.num_row and j < Board.num_col:
-        if state[i][j].piece is None:
-            moves.append((i, j))
-        elif state[i][j].piece is not None:
-            if state[i][j].piece.color != piece.color:
-                moves.append((i, j))
-                break
-            else:
-                break
-        i += 1
-        j += 1
-
-    i, j = m - 1, n - 1
-    while i >= 0 and j >= 0:
-        if state[i][j].piece is None:
-            moves.append((i, j))
-        elif state[i][j].piece is not None:
-            if state[i][j].piece.color != piece.color:
-                moves.append((i, j))
-                break
-            else:
-                break
-        i -= 1
-        j -= 1
-
-    i, j = m + 1, n - 1
-    while i < Board.num_row and j >= 0:
-        if state[i][j].piece is None:
-            moves.append((i, j))
-        elif state[i][j].piece is not None:
-            if state[i][j].piece.color != piece.color:
-                moves.append((i, j))
-                break
-            else:
-                break
-        i += 1
-        j -= 1
-
-    i, j = m - 1, n + 1
-    while i >= 0 and j < Board.num_col:
-        if state[i][j].piece is None:
-            moves.append((i, j))
-        elif state[i][j].piece is not None:
-            if state[i][j].piece.color != piece.color:
-                moves.append((i, j))
-                break
-            else:
-                break
-        i -= 1
-        j += 1
-
+    # All 4 diagonals, each stopping at (and including) the first blocker
+    targets = bishop_attacks(sq, board.bitboards.occupied) & ~own
     if check_for_pin:
-        return filter_out_pinned_moves(piece, board, moves)
+        targets &= legal_target_mask(piece, board)
 
-    return moves
+    if moves is not None:
+        moves.add_targets(sq, targets)
+        return moves
+    return targets_to_coords(targets)
@@ -0,0 +1,176 @@
+from typing import TYPE_CHECKING
+
+from ..bitboard import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from ..move_list import MoveList
+from .attack_tables import (
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    PAWN_ATTACKS,
+    PROMOTION_ROWS,
+    pawn_push_targets,
+)
+from .king import castling_targets, safe_king_targets
+from .magics import bishop_attacks, queen_attacks, rook_attacks
+from .pawn import en_passant_target
+from .pins import get_pin_info
+
+if TYPE_CHECKING:
+    from ..board import Board
+
+
+def generate_legal_moves(board: 'Board', color: int, moves: MoveList) -> MoveList:
+    """
+    Fills `moves` with every legal move of `color` in one pass over the
+    bitboards, using the position's pin and check masks.
+
+    Args:
+        board (Board): The position to generate moves for.
+        color (int): Side to move (0 = white, 1 = black).
+        moves (MoveList): Buffer to fill; it is cleared first.
+
+    Returns:
+        MoveList: The same `moves` buffer.
+    """
+    moves.clear()
+    bitboards = board.bitboards
+    pieces = bitboards.pieces
+    base = color * 6
+    not_own = ~bitboards.occupancy[color]
+    enemy = bitboards.occupancy[1 - color]
+    occupied = bitboards.occupied
+    info = get_pin_info(board, color)
+
+    king_sq = info.king_sq
+    moves.add_targets(king_sq, safe_king_targets(board, king_sq, color, KING_ATTACKS[king_sq] & not_own))
+    check_mask = info.check_mask
+    if not check_mask:
+        # Double check: only the king can move
+        return moves
+    if not info.checkers:
+        moves.add_targets(king_sq, castling_targets(board, color, king_sq))
+    pin_rays = info.pin_rays
+
+    promotion_row = PROMOTION_ROWS[color]
+    bb = pieces[base + PAWN]
+    while bb:
+        lsb = bb & -bb
+        bb ^= lsb
+        sq = lsb.bit_length() - 1
+        targets = (pawn_push_targets(sq, color, occupied) | (PAWN_ATTACKS[color][sq] & enemy)) & check_mask
+        if sq in pin_rays:
+            targets &= pin_rays[sq]
+        if targets & promotion_row:
+            moves.add_promotions(sq, targets)
+        else:
+            # En passant is checked on its own: capturing the checking pawn
+            # resolves a check even though the target is not in check_mask.
+            moves.add_targets(sq, targets | en_passant_target(board, color, sq))
+
+    for piece_type in (KNIGHT, BISHOP, ROOK, QUEEN):
+        bb = pieces[base + piece_type]
+        while bb:
+            lsb = bb & -bb
+            bb ^= lsb
+            sq = lsb.bit_length() - 1
+            if piece_type == KNIGHT:
+                targets = KNIGHT_ATTACKS[sq] & not_own
+            elif piece_type == BISHOP:
+                targets = bishop_attacks(sq, occupied) & not_own
+            elif piece_type == ROOK:
+                targets = rook_attacks(sq, occupied) & not_own
+            else:
+                targets = queen_attacks(sq, occupied) & not_own
+            targets &= check_mask
+            if sq in pin_rays:
+                targets &= pin_rays[sq]
+            moves.add_targets(sq, targets)
+
+    return moves
+
+
+def is_legal_move(board: 'Board', color: int, from_sq: int, to_sq: int) -> bool:
+    """
+    Whether the `color` piece on `from_sq` may legally move to `to_sq`. The
+    caller has already checked that `from_sq` holds a `color` piece and that
+    `to_sq` does not; this tests geometry, blockers, pins and check evasion
+    for that one move only.
+    """
+    bitboards = board.bitboards
+    piece_type = (board.squares[from_sq] - 1) % 6
+    to_bit = 1 << to_sq
+    occupied = bitboards.occupied
+
+    if piece_type == KING:
+        if KING_ATTACKS[from_sq] & to_bit:
+            return bool(safe_king_targets(board, from_sq, color, to_bit))
+        return bool(castling_targets(board, color, from_sq) & to_bit)
+
+    if piece_type == PAWN:
+        targets = pawn_push_targets(from_sq, color, occupied) | (PAWN_ATTACKS[color][from_sq] & bitboards.occupancy[1 - color])
+        if not targets & to_bit:
+            return to_sq == board.ep_square and bool(en_passant_target(board, color, from_sq))
+    elif piece_type == KNIGHT:
+        if not KNIGHT_ATTACKS[from_sq] & to_bit:
+            return False
+    elif piece_type == BISHOP:
+        if not bishop_attacks(from_sq, occupied) & to_bit:
+            return False
+    elif piece_type == ROOK:
+        if not rook_attacks(from_sq, occupied) & to_bit:
+            return False
+    elif not queen_attacks(from_sq, occupied) & to_bit:
+        return False
+
+    info = get_pin_info(board, color)
+    if not info.check_mask & to_bit:
+        return False
+    pin_ray = info.pin_rays.get(from_sq)
+    return pin_ray is None or bool(pin_ray & to_bit)
+
+
+def has_legal_move(board: 'Board', color: int) -> bool:
+    """
+    Whether `color` has any legal move. Stops at the first piece with a
+    legal target, which is all mate/stalemate detection needs.
+    """
+    bitboards = board.bitboards
+    pieces = bitboards.pieces
+    base = color * 6
+    not_own = ~bitboards.occupancy[color]
+    enemy = bitboards.occupancy[1 - color]
+    occupied = bitboards.occupied
+    info = get_pin_info(board, color)
+
+    king_sq = info.king_sq
+    if safe_king_targets(board, king_sq, color, KING_ATTACKS[king_sq] & not_own):
+        return True
+    check_mask = info.check_mask
+    if not check_mask:
+        return False
+    pin_rays = info.pin_rays
+    # Castling never needs checking: if it is legal, so is the king's step
+    # onto the square next to it.
+    for piece_type in (KNIGHT, PAWN, BISHOP, ROOK, QUEEN):
+        bb = pieces[base + piece_type]
+        while bb:
+            lsb = bb & -bb
+            bb ^= lsb
+            sq = lsb.bit_length() - 1
+            if piece_type == PAWN:
+                if en_passant_target(board, color, sq):
+                    return True
+                targets = pawn_push_targets(sq, color, occupied) | (PAWN_ATTACKS[color][sq] & enemy)
+            elif piece_type == KNIGHT:
+                targets = KNIGHT_ATTACKS[sq] & not_own
+            elif piece_type == BISHOP:
+                targets = bishop_attacks(sq, occupied) & not_own
+            elif piece_type == ROOK:
+                targets = rook_attacks(sq, occupied) & not_own
+            else:
+                targets = queen_attacks(sq, occupied) & not_own
+            targets &= check_mask
+            if sq in pin_rays:
+                targets &= pin_rays[sq]
+            if targets:
+                return True
+    return False
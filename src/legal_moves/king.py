@@ -1,60 +1,168 @@
-from typing import List, Tuple, TYPE_CHECKING
+from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from ..bitboard import (
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    SQUARE_BB,
+    WHITE_KING_SIDE,
+    WHITE_QUEEN_SIDE,
+    BLACK_KING_SIDE,
+    BLACK_QUEEN_SIDE,
+    color_index,
+    square_index,
+)
+from .attack_tables import (
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    PAWN_ATTACKS,
+    targets_to_coords,
+)
+from .magics import bishop_attacks, rook_attacks
+from ..move_list import MoveList
 
 if TYPE_CHECKING:
     from board import Board 
     from piece import Piece
 
-def all_king_moves(piece: 'Piece', board: 'Board') -> List[Tuple[int, int]]:
-    from ..utils.filter_out_pinned_moves import filter_out_pinned_moves
-    from ..board import Board
+def _squares(*coords: Tuple[int, int]) -> int:
+    mask = 0
+    for row, col in coords:
+        mask |= SQUARE_BB[square_index(row, col)]
+    return mask
+
+# Per color: (right, king from, king to, rook from, squares that must be
+# empty, squares the king passes through or lands on).
+CASTLING_MOVES = [
+    [
+        (WHITE_KING_SIDE, square_index(7, 4), square_index(7, 6), square_index(7, 7),
+         _squares((7, 5), (7, 6)), (square_index(7, 5), square_index(7, 6))),
+        (WHITE_QUEEN_SIDE, square_index(7, 4), square_index(7, 2), square_index(7, 0),
+         _squares((7, 1), (7, 2), (7, 3)), (square_index(7, 3), square_index(7, 2))),
+    ],
+    [
+        (BLACK_KING_SIDE, square_index(0, 4), square_index(0, 6), square_index(0, 7),
+         _squares((0, 5), (0, 6)), (square_index(0, 5), square_index(0, 6))),
+        (BLACK_QUEEN_SIDE, square_index(0, 4), square_index(0, 2), square_index(0, 0),
+         _squares((0, 1), (0, 2), (0, 3)), (square_index(0, 3), square_index(0, 2))),
+    ],
+]
+
+def all_king_moves(
+    piece: 'Piece',
+    board: 'Board',
+    moves: Optional[MoveList] = None
+) -> Union[List[Tuple[int, int]], MoveList]:
+    color = color_index(piece.color)
+    own = board.bitboards.occupancy[color]
     m, n = piece.position
-    moves: List[Tuple[int, int]] = []
-    king_moves = [
-        (m + 1, n),     # down
-        (m - 1, n),     # up
-        (m, n + 1),     # right
-        (m, n - 1),     # left
-        (m + 1, n + 1), # down-right
-        (m + 1, n - 1), # down-left
-        (m - 1, n + 1), # up-right
-        (m - 1, n - 1), # up-left
-    ]
-
-    state = board.get_board_state()
-
-    for x, y in king_moves:
-        if x < 0 or x >= Board.num_row or y < 0 or y >= Board.num_col:
+    sq = m * 8 + n
+
+    targets = safe_king_targets(board, sq, color, KING_ATTACKS[sq] & ~own)
+    targets |= castling_targets(board, color, sq)
+    if moves is not None:
+        moves.add_targets(sq, targets)
+        return moves
+    return targets_to_coords(targets)
+
+def castling_targets(board: 'Board', color: int, king_sq: int) -> int:
+    """
+    Destination squares of the legal castling moves of `color`: the right is
+    still held, king and rook are on their home squares, the squares between
+    them are empty and the king is not in, through or into check.
+    """
+    rights = board.castling_rights
+    bitboards = board.bitboards
+    rooks = bitboards.pieces[color * 6 + ROOK]
+    occupied = bitboards.occupied
+    enemy = 1 - color
+    targets = 0
+    in_check = None
+    for right, king_from, king_to, rook_from, empty, crossed in CASTLING_MOVES[color]:
+        if (
+            not rights & right or
+            king_sq != king_from or
+            not rooks & SQUARE_BB[rook_from] or
+            occupied & empty
+        ):
             continue
-        target_cell = state[x][y]
-        if target_cell.piece is None or target_cell.piece.color != piece.color:
-            moves.append((x, y))
+        if in_check is None:
+            in_check = is_square_attacked(board, king_sq, enemy)
+        if in_check:
+            return 0
+        if not any(is_square_attacked(board, sq, enemy) for sq in crossed):
+            targets |= SQUARE_BB[king_to]
+    return targets
 
-    return filter_out_pinned_moves(piece, board, moves)
+def safe_king_targets(board: 'Board', king_sq: int, color: int, targets: int) -> int:
+    """Drops every target square the opponent attacks once the king has left `king_sq`."""
+    occupied = board.bitboards.occupied & ~SQUARE_BB[king_sq]
+    enemy = 1 - color
+    safe = 0
+    while targets:
+        lsb = targets & -targets
+        targets ^= lsb
+        if not is_square_attacked(board, lsb.bit_length() - 1, enemy, occupied):
+            safe |= lsb
+    return safe
 
 def is_in_check(color: str, board: 'Board') -> bool:
     king_x, king_y = get_king_position(board, color)
-    state = board.get_board_state()
-    king_cell = state[king_x][king_y]
-    opponent_color = "b" if king_cell.piece and king_cell.piece.color == "w" else "w"
-    opponent_pieces = [
-        cell.piece
-        for row in state
-        for cell in row
-        if cell.piece and cell.piece.color == opponent_color
-    ]
-    for piece in opponent_pieces:
-        if not piece:
-            continue
-        legal_moves = piece.get_legal_moves(board, check_for_pin=False)
-        if any(move[0] == king_x and move[1] == king_y for move in legal_moves):
-            return True
-    return False
+    return is_square_attacked(board, king_x * 8 + king_y, 1 - color_index(color))
+
+def is_square_attacked(
+    board: 'Board',
+    sq: int,
+    by_color: int,
+    occupied: Optional[int] = None
+) -> bool:
+    """
+    Looks outward from `sq` along knight, pawn, king and slider rays and
+    returns as soon as one of them lands on a `by_color` piece, instead of
+    generating the opponent's moves.
+
+    Args:
+        board (Board): The board to inspect.
+        sq (int): The square to test, row * 8 + col.
+        by_color (int): The attacking color index (0 = white, 1 = black).
+        occupied (Optional[int]): Occupancy to use for slider rays, e.g. with
+            the defending king lifted off the board. Defaults to the board's.
+    """
+    pieces = board.bitboards.pieces
+    base = by_color * 6
+    if KNIGHT_ATTACKS[sq] & pieces[base + KNIGHT]:
+        return True
+    # A pawn of `by_color` attacks sq from where a pawn of the other color on sq would attack.
+    if PAWN_ATTACKS[1 - by_color][sq] & pieces[base + PAWN]:
+        return True
+    if KING_ATTACKS[sq] & pieces[base + KING]:
+        return True
+    if occupied is None:
+        occupied = board.bitboards.occupied
+    queens = pieces[base + QUEEN]
+    if rook_attacks(sq, occupied) & (pieces[base + ROOK] | queens):
+        return True
+    return bool(bishop_attacks(sq, occupied) & (pieces[base + BISHOP] | queens))
+
+def attackers_to(board: 'Board', sq: int, by_color: int, occupied: Optional[int] = None) -> int:
+    """Bitboard of every `by_color` piece attacking `sq`."""
+    pieces = board.bitboards.pieces
+    base = by_color * 6
+    if occupied is None:
+        occupied = board.bitboards.occupied
+    queens = pieces[base + QUEEN]
+    return (
+        (KNIGHT_ATTACKS[sq] & pieces[base + KNIGHT]) |
+        (PAWN_ATTACKS[1 - by_color][sq] & pieces[base + PAWN]) |
+        (KING_ATTACKS[sq] & pieces[base + KING]) |
+        (rook_attacks(sq, occupied) & (pieces[base + ROOK] | queens)) |
+        (bishop_attacks(sq, occupied) & (pieces[base + BISHOP] | queens))
+    )
 
 def get_king_position(board: 'Board', color: str) -> Tuple[int, int]:
-    from ..board import Board
-    for i in range(Board.num_row):
-        for j in range(Board.num_col):
-            cell = board.get_board_state()[i][j]
-            if cell.piece and cell.piece.type == "k" and cell.piece.color == color:
-                return (i, j)
+    king_sq = board.king_squares[color_index(color)]
+    if king_sq >= 0:
+        return divmod(king_sq, 8)
     raise Exception(f"King of color {color} not found on the board.",)
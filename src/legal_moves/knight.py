@@ -1,5 +1,8 @@
-from typing import List, Tuple, TYPE_CHECKING
-from ..utils.filter_out_pinned_moves import filter_out_pinned_moves
+from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from ..bitboard import color_index
+from .attack_tables import KNIGHT_ATTACKS, targets_to_coords
+from .pins import legal_target_mask
+from ..move_list import MoveList
 
 if TYPE_CHECKING:
     from ..board import Board
@@ -8,37 +11,18 @@ if TYPE_CHECKING:
 def all_knight_moves(
     piece: 'Piece',
     board: 'Board',
-    check_for_pin: bool = False
-) -> List[Tuple[int, int]]:
-    from ..board import Board
-    moves: List[Tuple[int, int]] = []
-    state = board.get_board_state()
+    check_for_pin: bool = False,
+    moves: Optional[MoveList] = None
+) -> Union[List[Tuple[int, int]], MoveList]:
+    own = board.bitboards.occupancy[color_index(piece.color)]
     m, n = piece.position
+    sq = m * 8 + n
 
-    # All 8 possible knight moves
-    knight_moves = [
-        (m + 2, n + 1),
-        (m + 2, n - 1),
-        (m - 2, n + 1),
-        (m - 2, n - 1),
-        (m + 1, n + 2),
-        (m + 1, n - 2),
-        (m - 1, n + 2),
-        (m - 1, n - 2),
-    ]
-
-    for x, y in knight_moves:
-        if x < 0 or x >= Board.num_row or y < 0 or y >= Board.num_col:
-            continue
-        target_cell = state[x][y]
-
-        if target_cell.piece is None:
-            moves.append((x, y))
-        elif target_cell.piece:
-            if target_cell.piece.color != piece.color:
-                moves.append((x, y))
-
+    targets = KNIGHT_ATTACKS[sq] & ~own
     if check_for_pin:
-        return filter_out_pinned_moves(piece, board, moves)
+        targets &= legal_target_mask(piece, board)
 
-    return moves
+    if moves is not None:
+        moves.add_targets(sq, targets)
+        return moves
+    return targets_to_coords(targets)
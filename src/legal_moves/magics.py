@@ -0,0 +1,170 @@
+import os
+import pickle
+import random
+from typing import List, Optional, Tuple
+
+from ..bitboard import FULL_BB, SQUARE_BB
+from .attack_tables import (
+    BISHOP_DIRECTIONS,
+    RAY_SQUARES,
+    ROOK_DIRECTIONS,
+    bishop_ray_attacks,
+    rook_ray_attacks,
+)
+
+# Magic-bitboard slider attacks: the blockers on a square's relevant rays are
+# multiplied by a per-square magic number and the top bits of the product
+# index a table of precomputed attack sets.
+#
+# The magic numbers below were found with `find_magic` (seeded with
+# random.Random(1)). Searching takes over a minute in Python, so they are
+# kept as constants; the attack tables are built from them on first import
+# and cached to MAGIC_CACHE_PATH.
+
+MAGIC_CACHE_PATH = os.environ.get(
+    "CHESS_MAGIC_CACHE",
+    os.path.join(os.path.dirname(__file__), "magic_tables.pickle"),
+)
+_CACHE_VERSION = 1
+
+ROOK_MAGICS = [
+    0x128012C0008000E0, 0x0240002000401001, 0x4100200041001008, 0x8280100008018004,
+    0x2080080002040080, 0x1300010004008208, 0x04000208A9101408, 0x020000204A018F04,
+    0x1080800040008020, 0x0000C01000402001, 0x0080808010002000, 0x0408800800801000,
+    0x0010800801040080, 0x4804800400804200, 0x0304800D00800200, 0x010200040081006A,
+    0x8280044020084000, 0x042000C010004021, 0x2010002004080020, 0x0040210010000900,
+    0x0008004004020041, 0x0004008080040200, 0x1C20040070610208, 0x1020A20000508104,
+    0x0100C00380008120, 0x4001200280400080, 0x0200100080200080, 0x0000401200082200,
+    0xC02C080080040080, 0x0840040080020080, 0x2102004040800100, 0x0042079A00004104,
+    0x0000400424800280, 0x4820100020400040, 0x5010002000801880, 0x9061080081801002,
+    0x208A050011000800, 0x000200080E003094, 0xA010018204003008, 0x2000288042001401,
+    0x400181C000228000, 0x0200402010004000, 0x8388928600420021, 0x400021001001000A,
+    0x2100080011010004, 0x1002020004008080, 0x0802000804020001, 0x88004410408A0001,
+    0x010508C030800100, 0x4000400080310100, 0x0030200010048080, 0x2000800800100080,
+    0x0100040008008080, 0x0022000204008080, 0x0108020170284400, 0x1001010084004200,
+    0x0004890141902202, 0x0100881100220042, 0x0100102001000841, 0x4408050020081001,
+    0x0002008884201002, 0x2002000490410802, 0x0020014800900204, 0x0100082081044402,
+]
+
+BISHOP_MAGICS = [
+    0x0010104088840042, 0x0110104081004062, 0x0091142082000100, 0x0108208821008100,
+    0x0101104000080000, 0x010104200404001C, 0x0C01040202C00010, 0x0001004800841080,
+    0xCA8B46100E280102, 0x001010D00085024C, 0x4180089881020120, 0x8010082050411000,
+    0x0800020210100000, 0x0002120905201200, 0xC000040404040510, 0x0110410101100200,
+    0x0042201408020C27, 0xA882000404440C20, 0x0002000102040100, 0x800200202202C200,
+    0x4002005012101401, 0x2441014880600200, 0x0214020104018400, 0x000180004414410A,
+    0x0105410C10020800, 0x0004200084013400, 0x200582045004001B, 0x1000404004010200,
+    0x0001001081004021, 0x2400430202008628, 0x000604C144230800, 0x04004840008A1804,
+    0x4010045000220210, 0x2012100400500120, 0x10001C0205900081, 0x0020880800360A00,
+    0x8500460020060080, 0x0420008209010110, 0x0010020250008C00, 0x8010A40100004104,
+    0x00008208400022C8, 0x0008410450402100, 0x0008920110004104, 0x43A8011044002024,
+    0x0029102021900602, 0x2270101000212040, 0x0020C41112004040, 0x3004840550C42200,
+    0x5002022202404480, 0x0402822309200840, 0x0032010423240048, 0x2000CA0384110008,
+    0x4001140410440000, 0x2092E50810011010, 0x0140040852005041, 0x00200200C1010104,
+    0x40120202020104E0, 0xA000010042300500, 0x400048004A009001, 0x4200800400411081,
+    0x0010040604105400, 0x0107004210024080, 0x0004423004210040, 0xC220023088010040,
+]
+
+
+def _relevant_mask(sq: int, directions: Tuple[int, ...]) -> int:
+    # Edge squares never block anything further along the ray, so they are
+    # left out of the index.
+    mask = 0
+    for direction in directions:
+        for s in RAY_SQUARES[direction][sq][:-1]:
+            mask |= SQUARE_BB[s]
+    return mask
+
+
+def _subsets(mask: int) -> List[int]:
+    subsets = []
+    subset = 0
+    while True:
+        subsets.append(subset)
+        subset = (subset - mask) & mask
+        if subset == 0:
+            return subsets
+
+
+ROOK_MASKS: List[int] = [_relevant_mask(sq, ROOK_DIRECTIONS) for sq in range(64)]
+BISHOP_MASKS: List[int] = [_relevant_mask(sq, BISHOP_DIRECTIONS) for sq in range(64)]
+ROOK_SHIFTS: List[int] = [64 - bin(mask).count("1") for mask in ROOK_MASKS]
+BISHOP_SHIFTS: List[int] = [64 - bin(mask).count("1") for mask in BISHOP_MASKS]
+
+
+def _fill_table(sq: int, mask: int, magic: int, shift: int, attacks_fn) -> Optional[List[int]]:
+    table: List[Optional[int]] = [None] * (1 << (64 - shift))
+    for occupied in _subsets(mask):
+        attacks = attacks_fn(sq, occupied)
+        index = ((occupied * magic) & FULL_BB) >> shift
+        if table[index] is None:
+            table[index] = attacks
+        elif table[index] != attacks:
+            return None
+    return [attacks or 0 for attacks in table]
+
+
+def find_magic(sq: int, bishop: bool, rng: random.Random) -> Tuple[int, List[int]]:
+    """Searches for a collision-free magic number for one square."""
+    mask = BISHOP_MASKS[sq] if bishop else ROOK_MASKS[sq]
+    shift = BISHOP_SHIFTS[sq] if bishop else ROOK_SHIFTS[sq]
+    attacks_fn = bishop_ray_attacks if bishop else rook_ray_attacks
+    while True:
+        magic = rng.getrandbits(64) & rng.getrandbits(64) & rng.getrandbits(64)
+        if bin((mask * magic) & 0xFF00000000000000).count("1") < 6:
+            continue
+        table = _fill_table(sq, mask, magic, shift, attacks_fn)
+        if table is not None:
+            return magic, table
+
+
+def _build_tables() -> Tuple[List[List[int]], List[List[int]]]:
+    rook_tables = []
+    bishop_tables = []
+    for sq in range(64):
+        rook_table = _fill_table(sq, ROOK_MASKS[sq], ROOK_MAGICS[sq], ROOK_SHIFTS[sq], rook_ray_attacks)
+        bishop_table = _fill_table(sq, BISHOP_MASKS[sq], BISHOP_MAGICS[sq], BISHOP_SHIFTS[sq], bishop_ray_attacks)
+        if rook_table is None or bishop_table is None:
+            raise ValueError(f"Magic number for square {sq} has index collisions.")
+        rook_tables.append(rook_table)
+        bishop_tables.append(bishop_table)
+    return rook_tables, bishop_tables
+
+
+def _load_tables() -> Tuple[List[List[int]], List[List[int]]]:
+    """Reads the tables from MAGIC_CACHE_PATH, building and saving them if missing or stale."""
+    key = (_CACHE_VERSION, tuple(ROOK_MAGICS), tuple(BISHOP_MAGICS))
+    try:
+        with open(MAGIC_CACHE_PATH, "rb") as f:
+            cached = pickle.load(f)
+        if cached["key"] == key:
+            return cached["rook"], cached["bishop"]
+    except (OSError, EOFError, KeyError, TypeError, pickle.UnpicklingError):
+        pass
+
+    rook_tables, bishop_tables = _build_tables()
+    # Write to a temporary file and rename, so worker processes importing at
+    # the same time never read a half-written cache.
+    tmp_path = f"{MAGIC_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"key": key, "rook": rook_tables, "bishop": bishop_tables}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, MAGIC_CACHE_PATH)
+    except OSError:
+        pass
+    return rook_tables, bishop_tables
+
+
+ROOK_TABLES, BISHOP_TABLES = _load_tables()
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    return ROOK_TABLES[sq][(((occupied & ROOK_MASKS[sq]) * ROOK_MAGICS[sq]) & FULL_BB) >> ROOK_SHIFTS[sq]]
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    return BISHOP_TABLES[sq][(((occupied & BISHOP_MASKS[sq]) * BISHOP_MAGICS[sq]) & FULL_BB) >> BISHOP_SHIFTS[sq]]
+
+
+def queen_attacks(sq: int, occupied: int) -> int:
+    return rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
@@ -1,47 +1,69 @@
-from typing import List, TYPE_CHECKING
-from ..utils.filter_out_pinned_moves import filter_out_pinned_moves
+from typing import Optional, Union, TYPE_CHECKING
+from ..bitboard import BISHOP, KNIGHT, PAWN, QUEEN, ROOK, SQUARE_BB, WHITE, color_index
+from .attack_tables import KNIGHT_ATTACKS, PAWN_ATTACKS, PROMOTION_ROWS, pawn_push_targets, targets_to_coords
+from .magics import bishop_attacks, rook_attacks
+from .pins import legal_target_mask
+from ..move_list import MoveList
 
 if TYPE_CHECKING:
     from ..board import Board
     from ..piece import Piece
 
-def all_pawn_moves(pawn: 'Piece', board: 'Board', check_for_pin: bool = False) -> list[tuple[int, int]]:
-    from ..board import Board
-    state = board.get_board_state()
-    moves: list[tuple[int, int]] = []
+def all_pawn_moves(
+    pawn: 'Piece',
+    board: 'Board',
+    check_for_pin: bool = False,
+    moves: Optional[MoveList] = None
+) -> Union[list[tuple[int, int]], MoveList]:
+    """
+    Target squares of `pawn`, or, with `moves`, packed moves appended to
+    that buffer (one per promotion piece on the last row).
+    """
+    color = color_index(pawn.color)
+    enemy = board.bitboards.occupancy[1 - color]
     m, n = pawn.position
+    sq = m * 8 + n
 
-    white_pawn_moves: list[tuple[int, int, bool]] = [
-        (m - 1, n, False),
-        (m - 2, n, False),
-        (m - 1, n - 1, True),
-        (m - 1, n + 1, True),
-    ]
-    black_pawn_moves: list[tuple[int, int, bool]] = [
-        (m + 1, n, False),
-        (m + 2, n, False),
-        (m + 1, n - 1, True),
-        (m + 1, n + 1, True),
-    ]
-    pawn_moves = white_pawn_moves if pawn.color == "w" else black_pawn_moves
-
-    for x, y, capture in pawn_moves:
-        if x < 0 or x >= Board.num_row or y < 0 or y >= Board.num_col:
-            continue
-        target_cell = state[x][y]
+    # Normal moves onto empty squares, captures onto opponent pieces
+    targets = pawn_push_targets(sq, color, board.bitboards.occupied) | (PAWN_ATTACKS[color][sq] & enemy)
+    if check_for_pin:
+        targets &= legal_target_mask(pawn, board)
+    targets |= en_passant_target(board, color, sq, check_for_pin)
 
-        # Normal move
-        if target_cell.piece is None and not capture:
-            moves.append((x, y))
-        elif (
-            target_cell.piece is not None and
-            target_cell.piece.color != pawn.color and
-            capture
-        ):
-            # Capture move
-            moves.append((x, y))
+    if moves is not None:
+        if targets & PROMOTION_ROWS[color]:
+            moves.add_promotions(sq, targets)
+        else:
+            moves.add_targets(sq, targets)
+        return moves
+    return targets_to_coords(targets)
 
-    if check_for_pin:
-        return filter_out_pinned_moves(pawn, board, moves)
+def en_passant_target(board: 'Board', color: int, from_sq: int, legal: bool = True) -> int:
+    """
+    The en-passant square as a bitboard if the pawn on `from_sq` can capture
+    there, else 0. With `legal`, the capture is played out on the occupancy
+    (both pawns leave their squares) and rejected if that exposes the king,
+    which also covers the capturing pawn being pinned along a rank.
+    """
+    ep_square = board.ep_square
+    if ep_square < 0 or not PAWN_ATTACKS[color][from_sq] & SQUARE_BB[ep_square]:
+        return 0
+    enemy_base = (1 - color) * 6
+    pieces = board.bitboards.pieces
+    captured_sq = ep_square + 8 if color == WHITE else ep_square - 8
+    if not pieces[enemy_base + PAWN] & SQUARE_BB[captured_sq]:
+        return 0
+    if not legal:
+        return SQUARE_BB[ep_square]
 
-    return moves
+    king_sq = board.king_squares[color]
+    occupied = (board.bitboards.occupied ^ SQUARE_BB[from_sq] ^ SQUARE_BB[captured_sq]) | SQUARE_BB[ep_square]
+    queens = pieces[enemy_base + QUEEN]
+    if (
+        rook_attacks(king_sq, occupied) & (pieces[enemy_base + ROOK] | queens) or
+        bishop_attacks(king_sq, occupied) & (pieces[enemy_base + BISHOP] | queens) or
+        KNIGHT_ATTACKS[king_sq] & pieces[enemy_base + KNIGHT] or
+        PAWN_ATTACKS[color][king_sq] & pieces[enemy_base + PAWN] & ~SQUARE_BB[captured_sq]
+    ):
+        return 0
+    return SQUARE_BB[ep_square]
@@ -0,0 +1,97 @@
+from typing import Dict, TYPE_CHECKING
+
+from ..bitboard import BISHOP, COLORS, FULL_BB, QUEEN, ROOK, color_index
+from .attack_tables import BETWEEN, LINE
+from .king import attackers_to
+from .magics import bishop_attacks, rook_attacks
+
+if TYPE_CHECKING:
+    from ..board import Board
+    from ..piece import Piece
+
+
+class PinInfo:
+    """
+    Check and pin state of one side, computed once per position.
+
+    Attributes:
+        king_sq (int): Square of the side's king.
+        checkers (int): Bitboard of opponent pieces giving check.
+        check_mask (int): Squares a non-king move must land on to resolve
+            the check: everything when not in check, the checker plus the
+            squares between it and the king on single check, nothing on
+            double check.
+        pin_rays (Dict[int, int]): For every pinned piece, the line through
+            its king and pinner that it is allowed to move along.
+    """
+
+    __slots__ = ("king_sq", "checkers", "check_mask", "pin_rays")
+
+    def __init__(self, king_sq: int, checkers: int, check_mask: int, pin_rays: Dict[int, int]):
+        self.king_sq = king_sq
+        self.checkers = checkers
+        self.check_mask = check_mask
+        self.pin_rays = pin_rays
+
+
+def compute_pin_info(board: 'Board', color: int) -> PinInfo:
+    # Both kings must be on the board: the own king anchors every mask, and
+    # without the opponent's the position is not a legal one to move from.
+    for side in (color, 1 - color):
+        if board.king_squares[side] < 0:
+            raise Exception(f"King of color {COLORS[side]} not found on the board.",)
+    bitboards = board.bitboards
+    pieces = bitboards.pieces
+    king_sq = board.king_squares[color]
+    enemy = 1 - color
+    own_occ = bitboards.occupancy[color]
+    occupied = bitboards.occupied
+
+    checkers = attackers_to(board, king_sq, enemy)
+    if not checkers:
+        check_mask = FULL_BB
+    elif checkers & (checkers - 1):
+        check_mask = 0
+    else:
+        checker_sq = checkers.bit_length() - 1
+        check_mask = checkers | BETWEEN[king_sq][checker_sq]
+
+    # Opponent sliders that would see the king on an empty board; any of them
+    # with exactly one of our pieces in between pins that piece.
+    queens = pieces[enemy * 6 + QUEEN]
+    snipers = (
+        (rook_attacks(king_sq, 0) & (pieces[enemy * 6 + ROOK] | queens)) |
+        (bishop_attacks(king_sq, 0) & (pieces[enemy * 6 + BISHOP] | queens))
+    )
+    pin_rays: Dict[int, int] = {}
+    while snipers:
+        lsb = snipers & -snipers
+        snipers ^= lsb
+        sniper_sq = lsb.bit_length() - 1
+        between = BETWEEN[king_sq][sniper_sq] & occupied
+        if between and not between & (between - 1) and between & own_occ:
+            pin_rays[between.bit_length() - 1] = LINE[king_sq][sniper_sq]
+
+    return PinInfo(king_sq, checkers, check_mask, pin_rays)
+
+
+def get_pin_info(board: 'Board', color: int) -> PinInfo:
+    """Pin info for `color`, cached on the board until the next move."""
+    info = board.pin_info[color]
+    if info is None:
+        info = compute_pin_info(board, color)
+        board.pin_info[color] = info
+    return info
+
+
+def legal_target_mask(piece: 'Piece', board: 'Board') -> int:
+    """
+    Squares a non-king piece may move to without leaving its own king in
+    check: the check-evasion mask, narrowed to the pin line if it is pinned.
+    """
+    info = get_pin_info(board, color_index(piece.color))
+    m, n = piece.position
+    pin_ray = info.pin_rays.get(m * 8 + n)
+    if pin_ray is None:
+        return info.check_mask
+    return info.check_mask & pin_ray
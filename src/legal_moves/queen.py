@@ -1,13 +1,31 @@
-from typing import TYPE_CHECKING
-from .bishop import all_bishop_moves
-from .rook import all_rook_moves
+from typing import Optional, Union, TYPE_CHECKING
+from ..bitboard import color_index
+from .attack_tables import targets_to_coords
+from .magics import queen_attacks
+from .pins import legal_target_mask
+from ..move_list import MoveList
 
 if TYPE_CHECKING:
     from ..board import Board
     from ..piece import Piece
 
-def all_queen_moves(piece: 'Piece', board: 'Board', check_for_pin: bool = False) -> list[tuple[int, int]]:
-    rook_moves = all_rook_moves(piece, board, check_for_pin)
-    bishop_moves = all_bishop_moves(piece, board, check_for_pin)
-    moves = rook_moves + bishop_moves
-    return moves
+def all_queen_moves(
+    piece: 'Piece',
+    board: 'Board',
+    check_for_pin: bool = False,
+    moves: Optional[MoveList] = None
+) -> Union[list[tuple[int, int]], MoveList]:
+    own = board.bitboards.occupancy[color_index(piece.color)]
+    occupied = board.bitboards.occupied
+    m, n = piece.position
+    sq = m * 8 + n
+
+    # Rook and bishop rays combined, so the pin/check mask is applied once
+    targets = queen_attacks(sq, occupied) & ~own
+    if check_for_pin:
+        targets &= legal_target_mask(piece, board)
+
+    if moves is not None:
+        moves.add_targets(sq, targets)
+        return moves
+    return targets_to_coords(targets)
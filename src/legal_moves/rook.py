@@ -1,5 +1,9 @@
-from typing import List, Tuple, TYPE_CHECKING
-from ..utils.filter_out_pinned_moves import filter_out_pinned_moves
+from typing import List, Optional, Tuple, Union, TYPE_CHECKING
+from ..bitboard import color_index
+from .attack_tables import targets_to_coords
+from .magics import rook_attacks
+from .pins import legal_target_mask
+from ..move_list import MoveList
 
 if TYPE_CHECKING:
     from ..board import Board
@@ -8,71 +12,19 @@ if TYPE_CHECKING:
 def all_rook_moves(
     piece: 'Piece',
     board: 'Board',
-    check_for_pin: bool = False
-) -> List[Tuple[int, int]]:
-    from ..board import Board
-    moves: List[Tuple[int, int]] = []
-    state = board.get_board_state()
+    check_for_pin: bool = False,
+    moves: Optional[MoveList] = None
+) -> Union[List[Tuple[int, int]], MoveList]:
+    own = board.bitboards.occupancy[color_index(piece.color)]
     m, n = piece.position
+    sq = m * 8 + n
 
-    # Run through all vertical and horizontal directions
-    # Down
-    i, j = m + 1, n
-    while i < Board.num_row:
-        target_cell = state[i][j]
-        if target_cell.piece is None:
-            moves.append((i, j))
-        elif target_cell.piece:
-            if target_cell.piece.color != piece.color:
-                moves.append((i, j))
-                break
-            else:
-                break
-        i += 1
-
-    # Up
-    i, j = m - 1, n
-    while i >= 0:
-        target_cell = state[i][j]
-        if target_cell.piece is None:
-            moves.append((i, j))
-        elif target_cell.piece:
-            if target_cell.piece.color != piece.color:
-                moves.append((i, j))
-                break
-            else:
-                break
-        i -= 1
-
-    # Right
-    i, j = m, n + 1
-    while j < Board.num_col:
-        target_cell = state[i][j]
-        if target_cell.piece is None:
-            moves.append((i, j))
-        elif target_cell.piece:
-            if target_cell.piece.color != piece.color:
-                moves.append((i, j))
-                break
-            else:
-                break
-        j += 1
-
-    # Left
-    i, j = m, n - 1
-    while j >= 0:
-        target_cell = state[i][j]
-        if target_cell.piece is None:
-            moves.append((i, j))
-        elif target_cell.piece:
-            if target_cell.piece.color != piece.color:
-                moves.append((i, j))
-                break
-            else:
-                break
-        j -= 1
-
+    # All vertical and horizontal rays, each stopping at (and including) the first blocker
+    targets = rook_attacks(sq, board.bitboards.occupied) & ~own
     if check_for_pin:
-        return filter_out_pinned_moves(piece, board, moves)
+        targets &= legal_target_mask(piece, board)
 
-    return moves
\ No newline at end of file
+    if moves is not None:
+        moves.add_targets(sq, targets)
+        return moves
+    return targets_to_coords(targets)
@@ -0,0 +1,103 @@
+from array import array
+from typing import Iterator
+
+# Moves are packed into 16 bits: from square in bits 0-5, to square in
+# bits 6-11 and the promotion piece in bits 12-14 (0 = none). Squares use
+# the same row * 8 + col numbering as the bitboards.
+MAX_MOVES = 256
+
+
+def encode_move(from_sq: int, to_sq: int, promotion: int = 0) -> int:
+    return from_sq | (to_sq << 6) | (promotion << 12)
+
+
+def move_from(move: int) -> int:
+    return move & 63
+
+
+def move_to(move: int) -> int:
+    return (move >> 6) & 63
+
+
+def move_promotion(move: int) -> int:
+    return move >> 12
+
+
+def square_name(sq: int) -> str:
+    return f"{chr(97 + (sq & 7))}{8 - (sq >> 3)}"
+
+
+def parse_square(name: str) -> int:
+    return (8 - int(name[1])) * 8 + (ord(name[0]) - 97)
+
+
+def move_to_uci(move: int) -> str:
+    uci = square_name(move & 63) + square_name((move >> 6) & 63)
+    promotion = move >> 12
+    if promotion:
+        uci += "pnbrqk"[promotion]
+    return uci
+
+
+def move_from_uci(uci: str) -> int:
+    promotion = "pnbrqk".index(uci[4]) if len(uci) > 4 else 0
+    return encode_move(parse_square(uci[0:2]), parse_square(uci[2:4]), promotion)
+
+
+class MoveList:
+    """
+    Fixed-capacity buffer of packed moves. `clear()` only resets the length,
+    so one instance can be refilled for every position without reallocating.
+    """
+
+    __slots__ = ("buffer", "count")
+
+    def __init__(self, capacity: int = MAX_MOVES):
+        self.buffer = array("H", [0]) * capacity
+        self.count = 0
+
+    def clear(self):
+        self.count = 0
+
+    def append(self, move: int):
+        self.buffer[self.count] = move
+        self.count += 1
+
+    def add_targets(self, from_sq: int, targets: int):
+        """Appends one move from `from_sq` to every square set in `targets`."""
+        buffer = self.buffer
+        count = self.count
+        while targets:
+            lsb = targets & -targets
+            targets ^= lsb
+            buffer[count] = from_sq | ((lsb.bit_length() - 1) << 6)
+            count += 1
+        self.count = count
+
+    def add_promotions(self, from_sq: int, targets: int):
+        """Appends a queen, rook, bishop and knight promotion for every target square."""
+        while targets:
+            lsb = targets & -targets
+            targets ^= lsb
+            move = from_sq | ((lsb.bit_length() - 1) << 6)
+            for promotion in (4, 3, 2, 1):
+                self.append(move | (promotion << 12))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> int:
+        if not -self.count <= index < self.count:
+            raise IndexError("move index out of range")
+        return self.buffer[index % self.count]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(memoryview(self.buffer)[:self.count])
+
+    def __contains__(self, move: int) -> bool:
+        # Copy the live prefix and let the array scan it; the scan still
+        # boxes each element, but it runs in C and beats iterating a memoryview
+        return move in self.buffer[:self.count]
+
+    def __repr__(self):
+        return f"MoveList({list(self)})"
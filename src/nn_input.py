@@ -0,0 +1,180 @@
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .position_cache import PositionCache
+
+if TYPE_CHECKING:
+    from .board import Board
+
+# The one network encoding used for training (evolve-feedforward.py),
+# testing (test-feedforward.py) and by `Board` itself.
+#
+# Every square becomes 7 inputs: a one-hot piece type (P, N, B, R, Q, K)
+# and a color bit (0 = white, 1 = black). Squares follow the mailbox, so
+# a8 comes first and h1 last.
+SQUARE_INPUTS = 7
+NN_INPUT_SIZE = 64 * SQUARE_INPUTS
+# 32 pieces with a type and a color input each
+MAX_ACTIVE_INPUTS = 64
+
+# CODE_INPUTS[code] is the 7-input slot of a mailbox code (row 0: empty)
+CODE_INPUTS = np.zeros((13, SQUARE_INPUTS), dtype=np.uint8)
+for _code in range(1, 13):
+    CODE_INPUTS[_code, (_code - 1) % 6] = 1
+    CODE_INPUTS[_code, 6] = (_code - 1) // 6
+CODE_INPUTS.setflags(write=False)
+# The same slots as bytes, for patching a bytearray-backed vector in place
+CODE_INPUT_BYTES = [CODE_INPUTS[code].tobytes() for code in range(13)]
+
+_TABLES = {np.dtype(np.uint8): CODE_INPUTS}
+
+
+def code_table(dtype=np.uint8) -> np.ndarray:
+    """`CODE_INPUTS` converted to `dtype`, built once per dtype."""
+    dtype = np.dtype(dtype)
+    table = _TABLES.get(dtype)
+    if table is None:
+        table = CODE_INPUTS.astype(dtype)
+        table.setflags(write=False)
+        _TABLES[dtype] = table
+    return table
+
+
+def encode_squares(squares: bytes, dtype=np.uint8, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Encodes a 64-byte mailbox (`Board.squares`) with one table lookup.
+
+    Args:
+        squares (bytes): Piece codes, square 0 (a8) first.
+        dtype: Element type of the result, e.g. np.uint8 or np.float32.
+        out (np.ndarray, optional): Contiguous 448-element array of `dtype`
+            to write into instead of allocating.
+
+    Returns:
+        np.ndarray: The 448 inputs.
+    """
+    codes = np.frombuffer(squares, dtype=np.uint8)
+    table = code_table(dtype)
+    if out is not None and not out.flags.c_contiguous:
+        raise ValueError("out must be C-contiguous")
+    if out is None:
+        return table[codes].reshape(NN_INPUT_SIZE)
+    np.take(table, codes, axis=0, out=out.reshape(64, SQUARE_INPUTS))
+    return out
+
+
+def encode_batch(boards: Sequence['Board'], dtype=np.float32, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Encodes many boards into the rows of one (N, 448) array, ready to be fed
+    to a network as a single batch.
+
+    Args:
+        boards (Sequence[Board]): The positions, one per row.
+        dtype: Element type of the result.
+        out (np.ndarray, optional): Contiguous array of `dtype` with at least
+            N rows to fill; only the first N rows are written.
+
+    Returns:
+        np.ndarray: The (N, 448) inputs (a view of `out` when given).
+    """
+    count = len(boards)
+    if out is not None and not out.flags.c_contiguous:
+        raise ValueError("out must be C-contiguous")
+    codes = np.empty((count, 64), dtype=np.uint8)
+    for i, board in enumerate(boards):
+        codes[i] = np.frombuffer(board.squares, dtype=np.uint8)
+    if out is None:
+        out = np.empty((count, NN_INPUT_SIZE), dtype=dtype)
+    else:
+        out = out[:count]
+    np.take(code_table(dtype), codes, axis=0, out=out.reshape(count, 64, SQUARE_INPUTS))
+    return out
+
+
+def active_inputs(board: 'Board') -> List[int]:
+    """
+    Indices of the inputs that are 1 in the board's encoding, read from its
+    piece lists: at most two per piece (type and, for black, color).
+    """
+    squares = board.squares
+    id_squares = board.id_squares
+    active = []
+    for color, pids in enumerate(board.piece_lists):
+        for pid in pids:
+            sq = id_squares[pid]
+            start = sq * SQUARE_INPUTS
+            active.append(start + (squares[sq] - 1) % 6)
+            if color:
+                active.append(start + 6)
+    return active
+
+
+def active_input_batch(boards: Sequence['Board'], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    `active_inputs` of many boards as one (N, MAX_ACTIVE_INPUTS) index
+    array, each row padded with NN_INPUT_SIZE (an input that is never set).
+    """
+    count = len(boards)
+    if out is None:
+        out = np.empty((count, MAX_ACTIVE_INPUTS), dtype=np.intp)
+    else:
+        out = out[:count]
+    out.fill(NN_INPUT_SIZE)
+    for i, board in enumerate(boards):
+        active = active_inputs(board)
+        out[i, :len(active)] = active
+    return out
+
+
+class EncodingCache(PositionCache):
+    """
+    `PositionCache` holding encoded input vectors (read-only uint8 arrays)
+    instead of move lists, keyed by piece placement (`bytes(board.squares)`)
+    rather than Zobrist key: side to move, castling and en passant do not
+    change the inputs, so they would only duplicate entries. Placements
+    repeat across the genomes of a generation, so most of them are encoded
+    only once.
+    """
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        return super().get(key)
+
+    def peek(self, key: bytes) -> Optional[np.ndarray]:
+        return super().peek(key)
+
+    def put(self, key: bytes, entry: np.ndarray):
+        super().put(key, entry)
+
+
+default_encoding_cache = EncodingCache(maxsize=100_000)
+
+
+def encode_board(board: 'Board', cache: Optional[EncodingCache] = None) -> np.ndarray:
+    """
+    The network input of `board` (uint8, 448 elements), looked up by its
+    piece placement first. Pass a cache to keep the entries apart from the
+    process-wide `default_encoding_cache`.
+
+    The returned array is shared with the cache and must not be modified.
+    """
+    if cache is None:
+        cache = default_encoding_cache
+    key = bytes(board.squares)
+    vector = cache.get(key)
+    if vector is None:
+        vector = board.nn_input().copy()
+        vector.setflags(write=False)
+        cache.put(key, vector)
+    return vector
+
+
+def decode_output(output: Sequence[float]) -> Tuple[int, int]:
+    """
+    Reads the network's two outputs as (from, to) board squares. Each output
+    in [0, 1] is scaled to a square 0-63 counted from a1 and then flipped to
+    the board's a8 = 0 numbering.
+    """
+    from_index = min(max(int(output[0] * 63), 0), 63) ^ 56
+    to_index = min(max(int(output[1] * 63), 0), 63) ^ 56
+    return from_index, to_index
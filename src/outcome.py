@@ -0,0 +1,119 @@
+from typing import Optional, TYPE_CHECKING
+
+from .bitboard import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK, COLORS
+
+if TYPE_CHECKING:
+    from .board import Board
+
+# Termination reasons, named after python-chess's `Termination`
+CHECKMATE = "checkmate"
+STALEMATE = "stalemate"
+INSUFFICIENT_MATERIAL = "insufficient_material"
+SEVENTYFIVE_MOVES = "seventyfive_moves"
+FIVEFOLD_REPETITION = "fivefold_repetition"
+FIFTY_MOVES = "fifty_moves"
+THREEFOLD_REPETITION = "threefold_repetition"
+
+# Squares where (row + col) is even: a8 and h1 are light squares
+LIGHT_SQUARES = sum(1 << sq for sq in range(64) if ((sq >> 3) + (sq & 7)) % 2 == 0)
+DARK_SQUARES = ((1 << 64) - 1) ^ LIGHT_SQUARES
+
+
+class Outcome:
+    """
+    How a game ended.
+
+    Attributes:
+        termination (str): One of the termination constants in this module.
+        winner (Optional[str]): 'w' or 'b', or None for a draw.
+    """
+
+    __slots__ = ("termination", "winner")
+
+    def __init__(self, termination: str, winner: Optional[str] = None):
+        self.termination = termination
+        self.winner = winner
+
+    def result(self) -> str:
+        if self.winner is None:
+            return "1/2-1/2"
+        return "1-0" if self.winner == "w" else "0-1"
+
+    def __repr__(self):
+        return f"Outcome(termination={self.termination}, winner={self.winner})"
+
+
+def has_insufficient_material(board: 'Board', color: int) -> bool:
+    """Whether `color` cannot possibly mate, with the same rules as python-chess."""
+    pieces = board.bitboards.pieces
+    own = board.bitboards.occupancy[color]
+    other = board.bitboards.occupancy[1 - color]
+    pawns = pieces[PAWN] | pieces[6 + PAWN]
+    knights = pieces[KNIGHT] | pieces[6 + KNIGHT]
+    bishops = pieces[BISHOP] | pieces[6 + BISHOP]
+    rooks = pieces[ROOK] | pieces[6 + ROOK]
+    queens = pieces[QUEEN] | pieces[6 + QUEEN]
+    kings = pieces[KING] | pieces[6 + KING]
+
+    if own & (pawns | rooks | queens):
+        return False
+    if own & knights:
+        # A lone knight can only mate if the opponent has pieces to block with
+        return bin(own).count("1") <= 2 and not other & ~kings & ~queens
+    if own & bishops:
+        same_color = not bishops & DARK_SQUARES or not bishops & LIGHT_SQUARES
+        return same_color and not pawns and not knights
+    return True
+
+
+def is_insufficient_material(board: 'Board') -> bool:
+    return has_insufficient_material(board, WHITE) and has_insufficient_material(board, BLACK)
+
+
+def repetition_count(board: 'Board', limit: int) -> int:
+    """
+    How many times the current position has occurred, counting only plies
+    since the last capture or pawn move and stopping once `limit` is reached.
+    Uses the Zobrist keys on the board's undo stack.
+    """
+    key = board.zobrist_key
+    keys = board._key_stack
+    count = 1
+    # Same side to move only, so step back two plies at a time
+    oldest = max(board.ply - board.halfmove_clock, 0)
+    ply = board.ply - 2
+    while ply >= oldest and count < limit:
+        if keys[ply] == key:
+            count += 1
+        ply -= 2
+    return count
+
+
+def compute_outcome(board: 'Board', has_legal_move: bool, claim_draw: bool = False) -> Optional[Outcome]:
+    """
+    The game result, or None if the game goes on. Checkmate, stalemate,
+    insufficient material, the 75-move rule and fivefold repetition always
+    end the game; with `claim_draw`, so do the 50-move rule and threefold
+    repetition. Claims are judged on the current position only, unlike
+    python-chess, which also allows claiming on a move that would reach them.
+    """
+    if not has_legal_move:
+        if board.is_check():
+            return Outcome(CHECKMATE, COLORS[1 - COLORS.index(board.active_color)])
+        return Outcome(STALEMATE)
+    if is_insufficient_material(board):
+        return Outcome(INSUFFICIENT_MATERIAL)
+    if board.halfmove_clock >= 150:
+        return Outcome(SEVENTYFIVE_MOVES)
+    if board.halfmove_clock >= 8:
+        repetitions = repetition_count(board, 5)
+        if repetitions >= 5:
+            return Outcome(FIVEFOLD_REPETITION)
+    else:
+        repetitions = 1
+    if claim_draw:
+        if board.halfmove_clock >= 100:
+            return Outcome(FIFTY_MOVES)
+        if repetitions >= 3:
+            return Outcome(THREEFOLD_REPETITION)
+    return None
@@ -0,0 +1,173 @@
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .board import Board
+from .bitboard import color_index
+from .legal_moves.generate import generate_legal_moves
+from .move_list import MoveList, move_from_uci, move_to_uci
+from .utils.parse_fen import parse_fen
+from .utils import random_fens
+
+RANDOM_FENS_TXT = os.path.join(os.path.dirname(__file__), "..", "random_fens.txt")
+
+
+def load_fen_corpus(include_txt: bool = True, include_module: bool = True) -> List[str]:
+    """
+    The FENs from `random_fens.txt` (one quoted, comma-terminated FEN per
+    line) and `src/utils/random_fens.py`, without duplicates.
+    """
+    fens: List[str] = []
+    if include_txt and os.path.exists(RANDOM_FENS_TXT):
+        with open(RANDOM_FENS_TXT) as f:
+            for line in f:
+                fen = line.strip().rstrip(",").strip('"')
+                if fen:
+                    fens.append(fen)
+    if include_module:
+        fens.extend(random_fens.random_fens)
+    return list(dict.fromkeys(fens))
+
+
+def make_board(fen: str) -> Board:
+    return Board(fen, parse_fen(fen))
+
+
+def _perft(board: Board, depth: int, buffers: List[MoveList]) -> int:
+    # One buffer per depth: the board's own legal_moves() buffer would be
+    # overwritten by the recursion, and the position cache would skew nps.
+    moves = generate_legal_moves(board, color_index(board.active_color), buffers[depth])
+    if depth == 1:
+        return moves.count
+    nodes = 0
+    for i in range(moves.count):
+        board.push(moves.buffer[i])
+        nodes += _perft(board, depth - 1, buffers)
+        board.pop()
+    return nodes
+
+
+def perft(board: Board, depth: int) -> int:
+    """Number of leaf nodes of the legal move tree `depth` plies deep."""
+    if depth <= 0:
+        return 1
+    return _perft(board, depth, [MoveList() for _ in range(depth + 1)])
+
+
+def _check_divide_depth(depth: int):
+    # Depth 0 has no root moves to split by; its perft is just 1
+    if depth < 1:
+        raise ValueError(f"divide needs a depth of at least 1, got {depth}")
+
+
+def divide(board: Board, depth: int) -> Dict[str, int]:
+    """Perft split by root move, keyed by UCI string; `depth` must be at least 1."""
+    _check_divide_depth(depth)
+    root = list(board.legal_moves())
+    counts: Dict[str, int] = {}
+    for move in root:
+        board.push(move)
+        counts[move_to_uci(move)] = perft(board, depth - 1)
+        board.pop()
+    return counts
+
+
+def _divide_task(args: Tuple[str, str, int]) -> Tuple[str, int]:
+    fen, uci, depth = args
+    board = make_board(fen)
+    board.push(move_from_uci(uci))
+    return uci, perft(board, depth - 1)
+
+
+def parallel_divide(fen: str, depth: int, processes: Optional[int] = None) -> Dict[str, int]:
+    """`divide` with the root moves spread across a process pool."""
+    _check_divide_depth(depth)
+    board = make_board(fen)
+    tasks = [(fen, move_to_uci(move), depth) for move in board.legal_moves()]
+    with multiprocessing.Pool(processes or multiprocessing.cpu_count()) as pool:
+        return dict(pool.imap_unordered(_divide_task, tasks))
+
+
+def oracle_divide(fen: str, depth: int) -> Dict[str, int]:
+    """`divide` computed with python-chess, for cross-checking node counts."""
+    import chess
+
+    _check_divide_depth(depth)
+
+    def count(board: 'chess.Board', depth: int) -> int:
+        if depth <= 0:
+            return 1
+        if depth == 1:
+            return board.legal_moves.count()
+        nodes = 0
+        for move in board.legal_moves:
+            board.push(move)
+            nodes += count(board, depth - 1)
+            board.pop()
+        return nodes
+
+    board = chess.Board(fen)
+    counts: Dict[str, int] = {}
+    for move in list(board.legal_moves):
+        board.push(move)
+        counts[move.uci()] = count(board, depth - 1)
+        board.pop()
+    return counts
+
+
+class PerftResult:
+    __slots__ = ("fen", "depth", "nodes", "seconds", "expected", "mismatches")
+
+    def __init__(
+        self,
+        fen: str,
+        depth: int,
+        nodes: int,
+        seconds: float,
+        expected: Optional[int] = None,
+        mismatches: Optional[Dict[str, Tuple[Optional[int], Optional[int]]]] = None
+    ):
+        self.fen = fen
+        self.depth = depth
+        self.nodes = nodes
+        self.seconds = seconds
+        self.expected = expected
+        self.mismatches = mismatches or {}
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.expected is None or self.expected == self.nodes
+
+
+def run_perft(
+    fen: str,
+    depth: int,
+    processes: int = 1,
+    check_oracle: bool = False
+) -> PerftResult:
+    """
+    Runs divide on one position and times it. With `check_oracle`, the
+    per-root-move counts are diffed against python-chess; mismatches map a
+    UCI move to (ours, expected), with None for a move only one side has.
+    """
+    start = time.perf_counter()
+    if processes > 1:
+        counts = parallel_divide(fen, depth, processes)
+    else:
+        counts = divide(make_board(fen), depth)
+    seconds = time.perf_counter() - start
+    result = PerftResult(fen, depth, sum(counts.values()), seconds)
+
+    if check_oracle:
+        expected = oracle_divide(fen, depth)
+        result.expected = sum(expected.values())
+        for uci in counts.keys() | expected.keys():
+            ours, theirs = counts.get(uci), expected.get(uci)
+            if ours != theirs:
+                result.mismatches[uci] = (ours, theirs)
+    return result
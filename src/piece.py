@@ -1,10 +1,11 @@
-from typing import List, Tuple, Optional, Literal, TYPE_CHECKING
+from typing import List, Tuple, Optional, Literal, Union, TYPE_CHECKING
 from .legal_moves.pawn import all_pawn_moves
 from .legal_moves.queen import all_queen_moves
 from .legal_moves.knight import all_knight_moves
 from .legal_moves.rook import all_rook_moves
 from .legal_moves.bishop import all_bishop_moves
 from .legal_moves.king import all_king_moves
+from .move_list import MoveList
 
 if TYPE_CHECKING:
     from .board import Board
@@ -15,28 +16,76 @@ Position = Tuple[int, int]
 Promotion = Optional[Literal["r", "n", "b", "q"]]
 
 class Piece:
-    def __init__(self, type_: PieceType, color: PieceColor, position: Position):
+    # Boards store pieces as small-integer codes; Piece objects are built on
+    # demand as views of one square, so keep them small.
+    __slots__ = ("color", "type", "_position", "_lost", "promotion", "board", "piece_id")
+
+    def __init__(
+        self,
+        type_: PieceType,
+        color: PieceColor,
+        position: Position,
+        board: Optional['Board'] = None,
+        piece_id: int = -1
+    ):
         self.color = color
         self.type = type_
-        self.position = position
-        self.lost = False
+        self._position = position
+        self._lost = False
         self.promotion: Promotion = None
+        # Board the piece was read from, if any; promote_pawn writes through to it
+        self.board = board
+        # Stable identity on that board (see `Board.piece_lists`), -1 if none
+        self.piece_id = piece_id
+
+    @property
+    def position(self) -> Position:
+        """Where the piece stands now; follows the board's moves for a board-bound piece."""
+        if self.board is not None and self.piece_id >= 0:
+            sq = self.board.id_squares[self.piece_id]
+            if sq >= 0:
+                return (sq >> 3, sq & 7)
+        return self._position
+
+    @position.setter
+    def position(self, position: Position):
+        self._position = position
+
+    @property
+    def lost(self) -> bool:
+        """Whether the piece has been captured; read off the board for a board-bound piece."""
+        if self.board is not None and self.piece_id >= 0:
+            return self.board.id_squares[self.piece_id] < 0
+        return self._lost
+
+    @lost.setter
+    def lost(self, lost: bool):
+        self._lost = lost
 
-    def get_legal_moves(self, board: 'Board', check_for_pin: bool = False) -> List[Position]:
+    def get_legal_moves(
+        self,
+        board: 'Board',
+        check_for_pin: bool = False,
+        moves: Optional[MoveList] = None
+    ) -> Union[List[Position], MoveList]:
+        """
+        Target positions of this piece, or, when `moves` is given, the same
+        moves packed (see `src.move_list`) and appended to that buffer.
+        """
         if self.type == "p":
-            return all_pawn_moves(self, board, check_for_pin)
+            return all_pawn_moves(self, board, check_for_pin, moves)
         elif self.type == "q":
-            return all_queen_moves(self, board, check_for_pin)
+            return all_queen_moves(self, board, check_for_pin, moves)
         elif self.type == "n":
-            return all_knight_moves(self, board, check_for_pin)
+            return all_knight_moves(self, board, check_for_pin, moves)
         elif self.type == "r":
-            return all_rook_moves(self, board, check_for_pin)
+            return all_rook_moves(self, board, check_for_pin, moves)
         elif self.type == "b":
-            return all_bishop_moves(self, board, check_for_pin)
+            return all_bishop_moves(self, board, check_for_pin, moves)
         elif self.type == "k":
-            return all_king_moves(self, board)
+            return all_king_moves(self, board, moves)
         else:
-            return []
+            return [] if moves is None else moves
 
     def promote_pawn(self, new_type: Promotion):
         if self.type != "p":
@@ -45,6 +94,8 @@ class Piece:
             raise ValueError("Invalid promotion type")
         self.type = new_type
         self.promotion = new_type
+        if self.board is not None:
+            self.board.set_piece(self.position, self)
 
     def __repr__(self):
         return f"Piece(type={self.type}, color={self.color}, position={self.position}, lost={self.lost}, promotion={self.promotion})"
@@ -0,0 +1,68 @@
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class CachedPosition:
+    """What `Board` remembers about a position between visits."""
+
+    __slots__ = ("moves", "in_check", "game_over")
+
+    def __init__(self, moves: array, in_check: bool, game_over: bool):
+        self.moves = moves
+        self.in_check = in_check
+        self.game_over = game_over
+
+
+class PositionCache:
+    """
+    Size-bounded LRU cache from Zobrist key to `CachedPosition`.
+
+    Args:
+        maxsize (int): Most positions kept; the least recently used entry is
+            evicted first. 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int = 200_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[int, CachedPosition]' = OrderedDict()
+
+    def get(self, key: int) -> Optional[CachedPosition]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def peek(self, key: int) -> Optional[CachedPosition]:
+        """Like `get`, but leaves the hit/miss counters and LRU order alone."""
+        return self._entries.get(key)
+
+    def put(self, key: int, entry: CachedPosition):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
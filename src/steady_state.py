@@ -0,0 +1,275 @@
+import math
+import queue
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+import neat
+from neat.math_util import mean
+from neat.species import Species
+
+from .evaluator import WarmPoolEvaluator, pack_genome
+
+
+class SteadyStateEvolution:
+    """
+    Asynchronous steady-state driver for a `neat.Population`, as an
+    alternative to `Population.run` that has no generation barrier.
+
+    The initial population is evaluated as generation 0. After that, every
+    worker is kept busy with freshly bred children. Whenever a chunk of
+    children comes back, each child joins the population and the closest
+    species, the population's worst member is removed (never the best
+    genome or a species' elites), and a new chunk is bred and submitted.
+
+    Breeding uses the same knobs as `DefaultReproduction`: a species is
+    picked in proportion to its adjusted fitness (stagnant species only if
+    nothing else is left), parents come from its top `survival_threshold`
+    fraction, and the child is crossed over and mutated by the genome
+    type. Every `pop_size` evaluations count as one generation for the
+    reporters: species are re-speciated and stagnation is updated, and
+    `start_generation`/`post_evaluate`/`end_generation` are called as in
+    `Population.run`, so `StatisticsReporter` and `StdOutReporter` work
+    unchanged.
+
+    The evaluator's `CostModel` only orders generation 0, from size
+    guesses: afterwards chunks are submitted as soon as they are bred, so
+    there is no batch to schedule and measured costs are not fed back.
+    If the fitness threshold is met while chunks are still in flight, the
+    evaluator is terminated rather than left to finish them, and cannot
+    be used again.
+
+    Args:
+        population (neat.Population): Supplies config, species set,
+            reproduction (for genome ids, ancestors and stagnation),
+            reporters and the initial genomes. It is updated in place.
+        evaluator (WarmPoolEvaluator): Evaluates the chunks.
+        chunk_size (int): Children bred and evaluated together.
+        chunks_per_worker (int): Chunks kept in flight per worker.
+    """
+
+    def __init__(
+        self,
+        population: neat.Population,
+        evaluator: WarmPoolEvaluator,
+        chunk_size: int = 2,
+        chunks_per_worker: int = 2
+    ):
+        self.population = population
+        self.evaluator = evaluator
+        self.chunk_size = chunk_size
+        self.chunks_per_worker = chunks_per_worker
+        self.stagnant: Set[int] = set()
+        self._results: 'queue.Queue' = queue.Queue()
+        self._in_flight: Dict[int, object] = {}
+        self._unbred: Optional[int] = None
+
+    def run(self, n: Optional[int] = None):
+        """
+        Evolves until the fitness threshold is met or `n` generations'
+        worth of evaluations have been done, and returns the best genome.
+        """
+        pop = self.population
+        config = pop.config
+        if config.no_fitness_termination and n is None:
+            raise RuntimeError("Cannot have no generational limit with no fitness termination")
+
+        pop.reporters.start_generation(pop.generation)
+        self._evaluate_initial()
+        generations = 1
+        if self._end_generation():
+            return pop.best_genome
+
+        # Children still to breed; with a generation limit, none are bred
+        # past the last generation's quota, so nothing is left in flight.
+        self._unbred = None if n is None else (n - 1) * config.pop_size
+        for _ in range(self.evaluator.processes * self.chunks_per_worker):
+            self._submit_children()
+
+        evaluated = 0
+        while n is None or generations < n:
+            pop.reporters.start_generation(pop.generation)
+            while evaluated < config.pop_size:
+                for genome_id, fitness, _ in self._next_results():
+                    child = self._in_flight.pop(genome_id)
+                    child.fitness = fitness
+                    self._insert(child)
+                    evaluated += 1
+                self._submit_children()
+                if self._solved():
+                    break
+            evaluated = max(0, evaluated - config.pop_size)
+            generations += 1
+            if self._end_generation():
+                break
+
+        if self._in_flight:
+            # Solved early: nobody will read the remaining children, so don't
+            # let the evaluator's close() wait for them.
+            self.evaluator.terminate()
+            self._in_flight.clear()
+        if config.no_fitness_termination:
+            pop.reporters.found_solution(config, pop.generation, pop.best_genome)
+        return pop.best_genome
+
+    def _submit_children(self):
+        count = self.chunk_size
+        if self._unbred is not None:
+            count = min(count, self._unbred)
+            self._unbred -= count
+        if count > 0:
+            self._submit(self._breed(count))
+
+    def _submit(self, genomes: List[Tuple[int, object]]):
+        for genome_id, genome in genomes:
+            self._in_flight[genome_id] = genome
+        tasks = [(genome_id, pack_genome(genome)) for genome_id, genome in genomes]
+        self.evaluator.submit(tasks, self._results.put, self._results.put)
+
+    def _next_results(self) -> List[Tuple[int, float, float]]:
+        results = self._results.get()
+        if isinstance(results, BaseException):
+            raise results
+        return results
+
+    def _evaluate_initial(self):
+        pop = self.population
+        self._in_flight.update(pop.population)
+        tasks = [(genome_id, pack_genome(genome)) for genome_id, genome in pop.population.items()]
+        for chunk in self.evaluator.schedule(tasks):
+            self.evaluator.submit(chunk, self._results.put, self._results.put)
+        remaining = len(tasks)
+        while remaining:
+            for genome_id, fitness, _ in self._next_results():
+                self._in_flight.pop(genome_id).fitness = fitness
+                remaining -= 1
+
+    def _solved(self) -> bool:
+        pop = self.population
+        if pop.config.no_fitness_termination:
+            return False
+        fitness = pop.fitness_criterion(g.fitness for g in pop.population.values())
+        return fitness >= pop.config.fitness_threshold
+
+    def _report_generation(self):
+        pop = self.population
+        best = max(pop.population.values(), key=lambda g: g.fitness)
+        pop.reporters.post_evaluate(pop.config, pop.population, pop.species, best)
+        if pop.best_genome is None or best.fitness > pop.best_genome.fitness:
+            pop.best_genome = best
+
+    def _end_generation(self) -> bool:
+        """Reports the generation just completed; True if the run is over."""
+        pop = self.population
+        config = pop.config
+        self._report_generation()
+        if self._solved():
+            pop.reporters.found_solution(config, pop.generation, pop.best_genome)
+            return True
+
+        pop.species.speciate(config, pop.population, pop.generation)
+        self._update_stagnation()
+        pop.reporters.end_generation(config, pop.population, pop.species)
+        pop.generation += 1
+        return False
+
+    def _update_stagnation(self):
+        pop = self.population
+        self.stagnant = set()
+        for sid, s, stagnant in pop.reproduction.stagnation.update(pop.species, pop.generation):
+            if stagnant:
+                pop.reporters.species_stagnant(sid, s)
+                self.stagnant.add(sid)
+        fitnesses = [g.fitness for g in pop.population.values()]
+        low = min(fitnesses)
+        fitness_range = max(1.0, max(fitnesses) - low)
+        for s in pop.species.species.values():
+            s.adjusted_fitness = (mean(s.get_fitnesses()) - low) / fitness_range
+
+    def _insert(self, child):
+        pop = self.population
+        pop.population[child.key] = child
+        self._add_to_species(child)
+        if len(pop.population) > pop.config.pop_size:
+            self._remove_worst()
+
+    def _add_to_species(self, child):
+        pop = self.population
+        species_set = pop.species
+        genome_config = pop.config.genome_config
+        threshold = species_set.species_set_config.compatibility_threshold
+        best_sid, best_distance = None, None
+        for sid, s in species_set.species.items():
+            distance = child.distance(s.representative, genome_config)
+            if distance < threshold and (best_distance is None or distance < best_distance):
+                best_sid, best_distance = sid, distance
+        if best_sid is None:
+            best_sid = next(species_set.indexer)
+            s = Species(best_sid, pop.generation)
+            s.update(child, {})
+            species_set.species[best_sid] = s
+        species_set.species[best_sid].members[child.key] = child
+        species_set.genome_to_species[child.key] = best_sid
+
+    def _remove_worst(self):
+        """
+        Drops the member with the lowest fitness shared by species size,
+        leaving alone the best genome and every species' elites.
+        """
+        pop = self.population
+        species_set = pop.species
+        elitism = pop.reproduction.reproduction_config.elitism
+        fitnesses = [g.fitness for g in pop.population.values()]
+        low = min(fitnesses)
+        fitness_range = max(1.0, max(fitnesses) - low)
+        best_key = max(pop.population.values(), key=lambda g: g.fitness).key
+
+        worst_key, worst_score = None, None
+        for s in species_set.species.values():
+            ranked = sorted(s.members.values(), key=lambda g: g.fitness, reverse=True)
+            for genome in ranked[elitism:]:
+                if genome.key == best_key:
+                    continue
+                score = (genome.fitness - low) / fitness_range / len(ranked)
+                if worst_score is None or score < worst_score:
+                    worst_key, worst_score = genome.key, score
+        if worst_key is None:
+            return
+
+        del pop.population[worst_key]
+        sid = species_set.genome_to_species.pop(worst_key)
+        s = species_set.species[sid]
+        del s.members[worst_key]
+        if not s.members:
+            del species_set.species[sid]
+
+    def _breed(self, count: int) -> List[Tuple[int, object]]:
+        pop = self.population
+        config = pop.config
+        reproduction = pop.reproduction
+        repro_config = reproduction.reproduction_config
+        species = [s for s in pop.species.species.values() if s.members and s.key not in self.stagnant]
+        if not species:
+            species = [s for s in pop.species.species.values() if s.members]
+
+        fitnesses = [g.fitness for g in pop.population.values()]
+        low = min(fitnesses)
+        fitness_range = max(1.0, max(fitnesses) - low)
+        # A small floor keeps the least fit species breeding now and then
+        weights = [(mean(s.get_fitnesses()) - low) / fitness_range + 0.01 for s in species]
+
+        children = []
+        for _ in range(count):
+            s = random.choices(species, weights)[0]
+            members = sorted(s.members.items(), key=lambda item: item[1].fitness, reverse=True)
+            cutoff = max(int(math.ceil(repro_config.survival_threshold * len(members))), 2)
+            parents = members[:cutoff]
+            parent1_id, parent1 = random.choice(parents)
+            parent2_id, parent2 = random.choice(parents)
+
+            genome_id = next(reproduction.genome_indexer)
+            child = config.genome_type(genome_id)
+            child.configure_crossover(parent1, parent2, config.genome_config)
+            child.mutate(config.genome_config)
+            reproduction.ancestors[genome_id] = (parent1_id, parent2_id)
+            children.append((genome_id, child))
+        return children
@@ -1,8 +1,9 @@
-from typing import List
+from ..nn_input import decode_output
 
 def decompress_nn_output(from_square, to_square):
     """
-    Decompresses the output of a neural network.
+    Decompresses the output of a neural network, with the same rounding and
+    rank flip as `nn_input.decode_output` (the decoder used for training).
 
     Args:
         from_square (float): The compressed 'from' square output from the neural network (normalized 0-1).
@@ -11,14 +12,12 @@ def decompress_nn_output(from_square, to_square):
     Returns:
         tuple[tuple[int, int], tuple[int, int]]: The decompressed output as two (row, col) tuples.
     """
-    return (
-        square_index_to_coords(min(max(round(from_square * 63), 0), 63)),
-        square_index_to_coords(min(max(round(to_square * 63), 0), 63))
-    )
+    from_index, to_index = decode_output((from_square, to_square))
+    return square_index_to_coords(from_index), square_index_to_coords(to_index)
 
 def square_index_to_coords(index: int) -> tuple[int, int]:
     """
-    Converts 0-63 index to (row, col) where row, col in 0-7.
-    Row 0 = rank 1 (bottom), Col 0 = file a (left).
+    Converts a 0-63 board square index to (row, col) where row, col in 0-7.
+    Row 0 = rank 8 (top), Col 0 = file a (left).
     """
-    return divmod(index, 8)  # returns (row, col)
\ No newline at end of file
+    return divmod(index, 8)  # returns (row, col)
@@ -1,5 +1,7 @@
 from typing import List, Tuple, TYPE_CHECKING
-from ..legal_moves.king import is_in_check
+from ..bitboard import SQUARE_BB, color_index
+from ..legal_moves.king import safe_king_targets
+from ..legal_moves.pins import legal_target_mask
 
 if TYPE_CHECKING:
     from board import Board
@@ -12,11 +14,14 @@ def filter_out_pinned_moves(
 ) -> List[Tuple[int, int]]:
     m, n = piece.position
 
-    valid_moves = []
-    for x, y in moves:
-        captured_piece = board.move_piece((m, n), (x, y), piece)  # Move the piece to the new position
-        is_pinned = is_in_check(piece.color, board)  # Check if the king is in check after the move
-        board.move_piece((x, y), (m, n), piece, captured_piece)  # Move back to original position
-        if not is_pinned:
-            valid_moves.append((x, y))
-    return valid_moves
+    # Filter against the position's pin and check masks instead of playing
+    # every move on the board and rescanning for check.
+    if piece.type == "k":
+        targets = 0
+        for x, y in moves:
+            targets |= SQUARE_BB[x * 8 + y]
+        mask = safe_king_targets(board, m * 8 + n, color_index(piece.color), targets)
+    else:
+        mask = legal_target_mask(piece, board)
+
+    return [(x, y) for x, y in moves if mask & SQUARE_BB[x * 8 + y]]
@@ -0,0 +1,44 @@
+import random
+from typing import List, TYPE_CHECKING
+
+from .bitboard import iter_bits, color_index
+from .legal_moves.attack_tables import PAWN_ATTACKS
+
+if TYPE_CHECKING:
+    from .board import Board
+
+# Fixed seed so keys, and anything cached by key, agree across processes.
+_rng = random.Random(0x5EED)
+
+# PIECE_KEYS[piece_index][square], piece_index as in `Bitboards.pieces`
+PIECE_KEYS: List[List[int]] = [[_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+BLACK_TO_MOVE_KEY: int = _rng.getrandbits(64)
+CASTLING_KEYS: List[int] = [_rng.getrandbits(64) for _ in range(16)]
+EP_FILE_KEYS: List[int] = [_rng.getrandbits(64) for _ in range(8)]
+
+
+def ep_key(board: 'Board', ep_square: int, color: int) -> int:
+    """
+    Key for an en-passant square, or 0 when no pawn of `color` (the side to
+    move) stands next to it. Positions that only differ by an unusable
+    en-passant square then hash the same, which repetition detection needs.
+    """
+    if ep_square < 0:
+        return 0
+    if PAWN_ATTACKS[1 - color][ep_square] & board.bitboards.pieces[color * 6]:
+        return EP_FILE_KEYS[ep_square & 7]
+    return 0
+
+
+def compute_hash(board: 'Board') -> int:
+    """Full Zobrist key of a position; `Board` updates its key incrementally."""
+    key = 0
+    for index, bb in enumerate(board.bitboards.pieces):
+        for sq in iter_bits(bb):
+            key ^= PIECE_KEYS[index][sq]
+    color = color_index(board.active_color)
+    if color:
+        key ^= BLACK_TO_MOVE_KEY
+    key ^= CASTLING_KEYS[board.castling_rights]
+    key ^= ep_key(board, board.ep_square, color)
+    return key
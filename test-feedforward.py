@@ -6,10 +6,13 @@ import os
 import pickle
 
 import neat
-import chess
 import time
 
+from src.board import Board
+from src.move_list import encode_move, move_to_uci
+from src.nn_input import decode_output, encode_board
 from src.utils import random_fens
+from src.utils.parse_fen import parse_fen
 
 # load the winner
 with open('winner-feedforward', 'rb') as f:
@@ -28,56 +31,31 @@ config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
 
 net = neat.nn.FeedForwardNetwork.create(c, config)
 
-def board_to_nn_input(board: chess.Board):
-    """
-    6-bit piece type (one-hot) + 1-bit color per square = 7 bits × 64 = 448
-    """
-    piece_map = board.piece_map()
-    inputs = []
-
-    for square in chess.SQUARES:
-        piece = piece_map.get(square)
-        piece_encoding = [0] * 6
-        color_bit = 0
-
-        if piece:
-            piece_encoding[piece.piece_type - 1] = 1  # 1-6 mapped to 0-5
-            color_bit = 1 if piece.color == chess.WHITE else 0
-
-        inputs.extend(piece_encoding)
-        inputs.append(color_bit)
-
-    return inputs  # length = 448
-
-def decode_output(output):
-    from_index = min(max(int(round(output[0] * 63)), 0), 63)
-    to_index = min(max(int(round(output[1] * 63)), 0), 63)
-    return from_index, to_index
-
 def run_winner():
     fen = random_fens.get_random_fen()
-    board = chess.Board(fen)
+    board = Board(fen, parse_fen(fen))
 
     print("Starting game with best genome...\n")
 
     while not board.is_game_over():
-        inputs = board_to_nn_input(board)
+        inputs = encode_board(board)
         output = net.activate(inputs)
         from_idx, to_idx = decode_output(output)
         print(output)
-        move = chess.Move(from_idx, to_idx)
+        move = encode_move(from_idx, to_idx)
 
-        if move in board.legal_moves:
+        if move in board.legal_moves():
             board.push(move)
-            print(board.unicode(borders=True))
-            print(f"Move played: {board.peek().uci()}\n")
+            board.render_board()
+            print(f"Move played: {move_to_uci(move)}\n")
         else:
-            print(f"Illegal move attempted: {move.uci()}")
+            print(f"Illegal move attempted: {move_to_uci(move)}")
             break
 
         time.sleep(1)
 
-    print("Game over:", board.result())
+    outcome = board.outcome()
+    print("Game over:", outcome.result() if outcome else "*")
 
 if __name__ == "__main__":
     run_winner()
\ No newline at end of file